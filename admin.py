@@ -0,0 +1,255 @@
+"""
+Администрирование подписок.
+
+    python admin.py import <файл .csv|.jsonl> [--config PATH] [--validate]
+    python admin.py validate <файл .csv|.jsonl> [--workers N]
+    python admin.py dry-run <файл .csv|.jsonl> [--workers N]
+
+Файл содержит колонки (или ключи JSON) chat_id и practicum_token.
+"""
+import argparse
+import csv
+import json
+import logging
+import math
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import homework
+from breaker import CircuitBreaker
+from config import load_config
+from state import StateStore
+from traffic import CollectingBot
+
+WORKERS = 32
+IMPORT_FILE = 'subscriptions.json'
+
+
+def read_rows(path):
+    """
+    Читает строки подписок из CSV или JSONL.
+    Возвращает список (номер строки файла, строка).
+    Строка JSONL, которую не удалось разобрать, заменяется ошибкой.
+    """
+    rows = []
+    with open(path, encoding='utf-8', newline='') as rows_file:
+        if not path.endswith('.jsonl'):
+            reader = csv.DictReader(rows_file)
+            return [(reader.line_num, row) for row in reader]
+        for number, line in enumerate(rows_file, start=1):
+            if not line.strip():
+                continue
+            try:
+                rows.append((number, json.loads(line)))
+            except ValueError as error:
+                rows.append((number, error))
+    return rows
+
+
+def parse_row(row):
+    """
+    Проверяет одну строку.
+    Возвращает (chat_id, token) или текст ошибки.
+    """
+    if isinstance(row, ValueError):
+        return f'некорректный JSON: {row}'
+    if not isinstance(row, dict):
+        return f'ожидался объект, получено: {type(row).__name__}'
+    chat_id = str(row.get('chat_id') or '').strip()
+    token = str(row.get('practicum_token') or '').strip()
+    if not chat_id.lstrip('-').isdigit():
+        return f'некорректный chat_id: {chat_id!r}'
+    if not token:
+        return 'пустой practicum_token'
+    return chat_id, token
+
+
+def parse_rows(rows):
+    """
+    Проверяет формат строк (номер строки, строка).
+    Возвращает словарь chat_id: token и список ошибок (номер строки, текст).
+    """
+    subscriptions = {}
+    errors = []
+    for number, row in rows:
+        result = parse_row(row)
+        if isinstance(result, str):
+            errors.append((number, result))
+            continue
+        chat_id, token = result
+        if chat_id in subscriptions:
+            errors.append((number, f'повторный chat_id: {chat_id}'))
+        else:
+            subscriptions[chat_id] = token
+    return subscriptions, errors
+
+
+def make_session(workers):
+    """Создаёт сессию requests с пулом соединений на workers потоков."""
+    import requests
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=1, pool_maxsize=workers
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def check_token(session, token):
+    """
+    Проверяет токен запросом к API.
+    Возвращает 'ok', 'invalid' или описание ошибки.
+    """
+    import requests
+
+    try:
+        response = session.get(
+            homework.ENDPOINT,
+            headers={'Authorization': f'OAuth {token}'},
+            params={'from_date': int(time.time())},
+            timeout=homework.REQUEST_TIMEOUT
+        )
+    except requests.exceptions.RequestException as error:
+        return f'ошибка соединения: {error}'
+    if response.status_code == 200:
+        return 'ok'
+    if response.status_code in (401, 403):
+        return 'invalid'
+    return f'status_code {response.status_code}'
+
+
+def validate(subscriptions, workers=WORKERS):
+    """
+    Параллельно проверяет токены не более чем в workers потоках.
+    Возвращает словарь chat_id: результат проверки.
+    """
+    session = make_session(workers)
+    with ThreadPoolExecutor(workers) as pool:
+        results = pool.map(
+            lambda token: check_token(session, token),
+            subscriptions.values()
+        )
+        return dict(zip(subscriptions, results))
+
+
+def dry_run(subscriptions, workers=WORKERS):
+    """
+    Выполняет пробный опрос подписок без отправки сообщений.
+    Ответы проходят check_response и parse_status, как в работе бота.
+    На время пробного опроса BREAKER заменяется выключателем, который
+    не срабатывает: каждая строка получает свой результат, а сбои
+    не приостанавливают запросы бота.
+    Возвращает список (chat_id, сообщение).
+    """
+    breaker = homework.BREAKER
+    homework.SESSION = make_session(workers)
+    homework.BREAKER = CircuitBreaker(threshold=math.inf)
+    store = StateStore()
+    for chat_id, token in subscriptions.items():
+        store.add(chat_id, token, 1)
+    bot = CollectingBot()
+    poller = homework.make_poller(bot, workers)
+    try:
+        poller.poll(store.items())
+    finally:
+        poller.shutdown()
+        homework.SESSION = None
+        homework.BREAKER = breaker
+    return bot.messages
+
+
+def import_subscriptions(subscriptions, path):
+    """
+    Добавляет подписки в JSON-файл конфигурации.
+    Если path - директория, подписки пишутся в её файл IMPORT_FILE.
+    Файл заменяется атомарно, чтобы бот не прочитал его наполовину.
+    Возвращает число подписок во всей конфигурации.
+    """
+    config_path = path
+    if os.path.isdir(path):
+        path = os.path.join(path, IMPORT_FILE)
+    data = {}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as config_file:
+            data = json.load(config_file)
+    data.setdefault('subscriptions', {}).update(subscriptions)
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as config_file:
+        json.dump(data, config_file, ensure_ascii=False, indent=4)
+    os.replace(temp_path, path)
+    return len(load_config(config_path).subscriptions)
+
+
+def print_validation(results):
+    """Печатает итоги проверки и невалидные подписки."""
+    summary = Counter(
+        result if result in ('ok', 'invalid') else 'error'
+        for result in results.values()
+    )
+    print(f'Проверено: {len(results)}, валидных: {summary["ok"]}, '
+          f'невалидных: {summary["invalid"]}, ошибок: {summary["error"]}')
+    for chat_id, result in results.items():
+        if result != 'ok':
+            print(f'  {chat_id}: {result}')
+
+
+def command_import(args, subscriptions):
+    """Импортирует подписки в конфигурацию бота."""
+    if not args.config:
+        sys.exit('Не указан файл конфигурации: --config или BOT_CONFIG')
+    if args.validate:
+        results = validate(subscriptions, args.workers)
+        print_validation(results)
+        subscriptions = {
+            chat_id: token for chat_id, token in subscriptions.items()
+            if results[chat_id] == 'ok'
+        }
+    total = import_subscriptions(subscriptions, args.config)
+    print(f'Импортировано: {len(subscriptions)}, всего подписок: {total}')
+
+
+def command_validate(args, subscriptions):
+    """Проверяет токены подписок."""
+    print_validation(validate(subscriptions, args.workers))
+
+
+def command_dry_run(args, subscriptions):
+    """Показывает сообщения, которые получили бы подписчики."""
+    messages = dry_run(subscriptions, args.workers)
+    print(f'Подписок: {len(subscriptions)}, сообщений: {len(messages)}')
+    for message, count in Counter(text for _, text in messages).most_common():
+        print(f'  {count:>6} x {message}')
+
+
+COMMANDS = {
+    'import': command_import,
+    'validate': command_validate,
+    'dry-run': command_dry_run,
+}
+
+
+def main():
+    """Разбирает аргументы и выполняет команду."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('command', choices=COMMANDS)
+    parser.add_argument('path')
+    parser.add_argument('--config', default=homework.CONFIG_PATH)
+    parser.add_argument('--validate', action='store_true')
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+    start = time.perf_counter()
+    subscriptions, errors = parse_rows(read_rows(args.path))
+    for number, error in errors:
+        print(f'Строка {number}: {error}')
+    COMMANDS[args.command](args, subscriptions)
+    print(f'Время: {time.perf_counter() - start:.1f} с')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+NUMBERS = re.compile(r'\b([1-5])\d\d\b|\d+')
+
+
+def mask_number(match):
+    """Заменяет код HTTP его классом (5xx), остальные числа - на #."""
+    if match.group(1):
+        return f'{match.group(1)}xx'
+    return '#'
+
+
+def error_key(error):
+    """
+    Возвращает ключ группы ошибки: класс и текст без чисел.
+    Ошибки, отличающиеся только временем, идентификаторами или кодом
+    внутри одного класса HTTP, попадают в одну группу; 4xx и 5xx
+    группируются отдельно.
+    """
+    return type(error).__name__, NUMBERS.sub(mask_number, str(error))
+
+
+class ErrorGroup:
+    """Счётчики одной группы ошибок."""
+
+    __slots__ = ('count', 'tenants', 'example')
+
+    def __init__(self, example):
+        """Создаёт пустую группу с примером сообщения."""
+        self.count = 0
+        self.tenants = set()
+        self.example = example
+
+
+class ErrorAggregator:
+    """
+    Собирает ошибки всех подписок и формирует одну сводку за окно window.
+    Память ограничена: не больше max_groups групп и max_tenants
+    подписок на группу, остальное только подсчитывается.
+    Сводка без новых групп ошибок подавляется в течение repeat_after
+    секунд после предыдущей.
+    """
+
+    def __init__(self, window=600, repeat_after=3600, max_groups=20,
+                 max_tenants=1000, clock=time.monotonic):
+        """Создаёт пустой агрегатор."""
+        self.window = window
+        self.repeat_after = repeat_after
+        self.max_groups = max_groups
+        self.max_tenants = max_tenants
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.groups = OrderedDict()
+        self.dropped = 0
+        self.window_start = clock()
+        self.last_keys = None
+        self.last_sent = None
+
+    def add(self, error, chat_id):
+        """Учитывает ошибку подписки chat_id."""
+        key = error_key(error)
+        with self.lock:
+            group = self.groups.get(key)
+            if group is None:
+                if len(self.groups) >= self.max_groups:
+                    _, evicted = self.groups.popitem(last=False)
+                    self.dropped += evicted.count
+                group = self.groups[key] = ErrorGroup(str(error))
+            else:
+                self.groups.move_to_end(key)
+            group.count += 1
+            if len(group.tenants) < self.max_tenants:
+                group.tenants.add(chat_id)
+
+    def flush(self):
+        """
+        Закрывает окно, если оно истекло.
+        Возвращает текст сводки или None, если отправлять нечего.
+        """
+        now = self.clock()
+        with self.lock:
+            if now - self.window_start < self.window:
+                return None
+            groups, dropped = self.groups, self.dropped
+            self.groups = OrderedDict()
+            self.dropped = 0
+            self.window_start = now
+            if not groups:
+                self.last_keys = None
+                return None
+            keys = frozenset(groups)
+            if (self.last_keys is not None and keys <= self.last_keys
+                    and now - self.last_sent < self.repeat_after):
+                return None
+            self.last_keys = keys
+            self.last_sent = now
+        return self.summary(groups, dropped)
+
+    def summary(self, groups, dropped):
+        """Формирует текст сводки по группам ошибок."""
+        minutes = self.window // 60
+        lines = [f'Сбой в работе программы, сводка за {minutes} мин:']
+        by_count = sorted(groups.items(), key=lambda item: -item[1].count)
+        for (name, _), group in by_count:
+            tenants = len(group.tenants)
+            if tenants >= self.max_tenants:
+                tenants = f'{tenants}+'
+            lines.append(
+                f'{name} x {group.count} (подписок: {tenants}): '
+                f'{group.example}'
+            )
+        if dropped:
+            lines.append(f'Прочие ошибки: {dropped}')
+        return '\n'.join(lines)
@@ -0,0 +1,68 @@
+"""
+Бенчмарк массовой проверки подписок против локального mock API.
+Mock API запускается в отдельном процессе, чтобы не делить GIL с клиентом.
+
+Запуск: python benchmarks/bench_admin.py [количество строк]
+"""
+import csv
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import admin  # noqa: E402
+import homework  # noqa: E402
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROWS = 10000
+TARGET_SECONDS = 60
+
+
+def write_rows(path, count):
+    """Пишет CSV с подписками, каждая двадцатая - с невалидным токеном."""
+    with open(path, 'w', encoding='utf-8', newline='') as rows_file:
+        writer = csv.writer(rows_file)
+        writer.writerow(('chat_id', 'practicum_token'))
+        for index in range(count):
+            prefix = 'invalid' if index % 20 == 0 else 'token'
+            writer.writerow((100000000 + index, f'{prefix}-{index}'))
+
+
+def main():
+    """Замеряет разбор, проверку токенов и пробный опрос."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    logging.disable(logging.CRITICAL)
+    api = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.mock_api'], cwd=ROOT_DIR,
+        stdout=subprocess.PIPE, text=True
+    )
+    homework.ENDPOINT = api.stdout.readline().strip()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'students.csv')
+        write_rows(path, count)
+        start = time.perf_counter()
+        subscriptions, _ = admin.parse_rows(admin.read_rows(path))
+        parsed = time.perf_counter()
+        results = admin.validate(subscriptions)
+        validated = time.perf_counter()
+        messages = admin.dry_run(subscriptions)
+        finished = time.perf_counter()
+    api.terminate()
+    invalid = sum(result == 'invalid' for result in results.values())
+    print(f'Строк: {count}, невалидных токенов: {invalid}, '
+          f'сообщений пробного опроса: {len(messages)}')
+    print(f'Разбор: {parsed - start:.2f} с, проверка: '
+          f'{validated - parsed:.2f} с, пробный опрос: '
+          f'{finished - validated:.2f} с')
+    total = finished - start
+    print(f'Всего: {total:.2f} с (цель {TARGET_SECONDS} с)')
+    if total > TARGET_SECONDS:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
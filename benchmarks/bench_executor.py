@@ -0,0 +1,98 @@
+"""
+Бенчмарк опроса подписок на пулах потоков против локального mock API.
+
+Запуск: python benchmarks/bench_executor.py [количество подписок]
+"""
+import logging
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import homework  # noqa: E402
+from alerts import ErrorAggregator  # noqa: E402
+from benchmarks.mock_api import MockPracticumAPI  # noqa: E402
+from state import StateStore  # noqa: E402
+from traffic import CollectingBot  # noqa: E402
+
+SUBSCRIPTIONS = 500
+API_LATENCY = 0.01
+SEND_LATENCY = 0.002
+POOL_SIZES = (1, 4, 16, 64)
+
+
+class SlowBot:
+    """Бот, который имитирует задержку Telegram и проверяет порядок."""
+
+    def __init__(self):
+        """Создаёт пустой журнал сообщений."""
+        self.lock = threading.Lock()
+        self.messages = {}
+
+    def send_message(self, chat_id, text):
+        """Сохраняет сообщение после задержки."""
+        time.sleep(SEND_LATENCY)
+        with self.lock:
+            self.messages.setdefault(chat_id, []).append(text)
+
+
+def run(count, fetch_workers):
+    """Выполняет три цикла опроса. Возвращает среднее время цикла, с."""
+    store = StateStore()
+    for index in range(count):
+        store.add(str(index), f'token-{index}', 0)
+    bot = SlowBot()
+    poller = homework.make_poller(bot, fetch_workers, send_workers=4)
+    start = time.perf_counter()
+    for _ in range(3):
+        poller.poll(store.items())
+    poller.join()
+    elapsed = (time.perf_counter() - start) / 3
+    poller.shutdown()
+    return elapsed
+
+
+def run_outage(count, api):
+    """
+    Имитирует сбой API: все запросы получают 502.
+    Возвращает количество сообщений подписчикам и сводок оператору.
+    """
+    api.fault = lambda token: (502, b'Bad Gateway')
+    homework.ALERTS = ErrorAggregator(window=0)
+    store = StateStore()
+    for index in range(count):
+        store.add(str(index), f'token-{index}', 0)
+    bot = SlowBot()
+    operator_bot = CollectingBot()
+    poller = homework.make_poller(bot, 64, send_workers=4)
+    for _ in range(3):
+        poller.poll(store.items())
+        homework.report_errors(operator_bot)
+    poller.shutdown()
+    api.fault = None
+    homework.ALERTS = None
+    return sum(map(len, bot.messages.values())), len(operator_bot.messages)
+
+
+def main():
+    """Сравнивает время цикла опроса при разных размерах пула."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else SUBSCRIPTIONS
+    logging.disable(logging.CRITICAL)
+    api = MockPracticumAPI(latency=API_LATENCY)
+    homework.ENDPOINT = api.start()
+    print(f'Подписок: {count}, задержка API {API_LATENCY * 1000:.0f} мс, '
+          f'задержка Telegram {SEND_LATENCY * 1000:.0f} мс')
+    for size in POOL_SIZES:
+        elapsed = run(count, size)
+        print(f'Потоков запросов {size:>3}: цикл {elapsed:.2f} с, '
+              f'{count / elapsed:.0f} подписок/с')
+    tenant_messages, alerts = run_outage(count, api)
+    print(f'Сбой API, 3 цикла: сообщений подписчикам {tenant_messages}, '
+          f'сводок оператору {alerts}')
+    api.stop()
+
+
+if __name__ == '__main__':
+    main()
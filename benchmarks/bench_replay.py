@@ -0,0 +1,74 @@
+"""
+Бенчмарк воспроизведения трафика: пропускная способность обработки ответов.
+
+Запуск: python benchmarks/bench_replay.py [количество записей]
+"""
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from traffic import CollectingBot, Recorder, replay  # noqa: E402
+
+RECORDS = 100000
+STATUSES = ('approved', 'reviewing', 'rejected', 'unknown')
+
+
+class SyntheticResponse:
+    """Ответ API для генерации тестовой записи."""
+
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self.headers = {'Content-Type': 'application/json'}
+        self.text = json.dumps(data)
+
+
+def generate(path, records):
+    """Записывает синтетический трафик: статусы, пустые ответы и ошибки."""
+    recorder = Recorder(path)
+    for index in range(records):
+        roll = random.random()
+        if roll < 0.05:
+            response = SyntheticResponse(500, {})
+        elif roll < 0.5:
+            response = SyntheticResponse(
+                200, {'homeworks': [], 'current_date': index}
+            )
+        else:
+            response = SyntheticResponse(200, {
+                'homeworks': [{
+                    'homework_name': f'hw{index % 20}',
+                    'status': random.choice(STATUSES),
+                }],
+                'current_date': index,
+            })
+        recorder.record({'from_date': index}, response, 0.1)
+    recorder.close()
+
+
+def main():
+    """Генерирует запись и воспроизводит её без задержек."""
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else RECORDS
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'traffic.jsonl.gz')
+        generate(path, records)
+        size = os.path.getsize(path)
+        bot = CollectingBot()
+        start = time.perf_counter()
+        stats = replay(path, bot)
+        elapsed = time.perf_counter() - start
+    print(f'Записей: {stats["records"]}, размер лога: {size / records:.1f} '
+          'байт/запись')
+    print(f'Воспроизведение: {elapsed:.2f} с, '
+          f'{stats["records"] / elapsed:.0f} записей/с, '
+          f'сообщений: {len(bot.messages)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""
+Бенчмарк холодного старта: время запуска интерпретатора с импортом homework.
+
+Запуск: python benchmarks/bench_startup.py [количество запусков]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGET_MS = 80
+RUNS = 20
+
+
+def measure(code):
+    """Возвращает время выполнения кода в новом процессе, мс."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT_DIR, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    """Сравнивает старт бота с пустым интерпретатором."""
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else RUNS
+    baseline = statistics.median(measure('pass') for _ in range(runs))
+    boot = statistics.median(measure('import homework') for _ in range(runs))
+    print(f'Пустой интерпретатор: {baseline:.1f} мс')
+    print(f'Импорт homework:      {boot:.1f} мс (цель {TARGET_MS} мс)')
+    if boot > TARGET_MS:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
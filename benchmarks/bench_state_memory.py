@@ -0,0 +1,82 @@
+"""
+Бенчмарк памяти состояния подписок.
+
+Сравнивает словари с полным текстом сообщений и StateStore.
+Запуск: python benchmarks/bench_state_memory.py [количество подписок]
+"""
+import os
+import sys
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from state import StateStore, message_fingerprint  # noqa: E402
+
+TENANTS = 100000
+TARGET_BYTES_PER_TENANT = 128
+MESSAGE = ('Изменился статус проверки работы "username__hw05_final.zip". '
+           'Работа проверена: у ревьюера есть замечания.')
+
+
+def tenants(count):
+    """Возвращает идентификаторы чатов и токены подписок."""
+    chat_ids = [str(100000000 + index) for index in range(count)]
+    tokens = [f'y0_AgAAAAA{index:030d}' for index in range(count)]
+    return chat_ids, tokens
+
+
+def measure(build):
+    """Возвращает объём памяти, выделенной build(), в байтах."""
+    tracemalloc.start()
+    state = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del state
+    return size
+
+
+def build_dicts(chat_ids, tokens):
+    """Состояние в виде словарей с полным текстом последнего сообщения."""
+    def build():
+        state = {}
+        for chat_id, token in zip(chat_ids, tokens):
+            state[chat_id] = {
+                'practicum_token': token,
+                'current_timestamp': 1650000000 + len(state),
+                'old_message': MESSAGE + chat_id,
+                'status': 'rejected',
+            }
+        return state
+    return build
+
+
+def build_store(chat_ids, tokens):
+    """Состояние в колонках StateStore с отпечатками сообщений."""
+    def build():
+        store = StateStore()
+        for chat_id, token in zip(chat_ids, tokens):
+            store.add(chat_id, token, 1650000000 + len(store))
+            store[chat_id]['message_fingerprint'] = message_fingerprint(
+                MESSAGE + chat_id
+            )
+            store[chat_id]['status'] = 3
+        return store
+    return build
+
+
+def main():
+    """Печатает расход памяти на подписку без учёта ключей и токенов."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else TENANTS
+    chat_ids, tokens = tenants(count)
+    dicts = measure(build_dicts(chat_ids, tokens)) / count
+    store = measure(build_store(chat_ids, tokens)) / count
+    print(f'Подписок: {count}')
+    print(f'Словари с сообщениями: {dicts:.0f} байт/подписка')
+    print(f'StateStore:            {store:.0f} байт/подписка '
+          f'(цель {TARGET_BYTES_PER_TENANT})')
+    if store > TARGET_BYTES_PER_TENANT:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
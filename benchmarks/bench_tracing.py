@@ -0,0 +1,66 @@
+"""
+Бенчмарк накладных расходов трассировки на цикл опроса подписки.
+
+Запуск: python benchmarks/bench_tracing.py [количество циклов]
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import homework  # noqa: E402
+import tracing  # noqa: E402
+from state import StateStore  # noqa: E402
+from traffic import CollectingBot  # noqa: E402
+
+CYCLES = 100000
+STATUSES = ('approved', 'reviewing', 'rejected')
+
+
+def fetch(current_timestamp, practicum_token):
+    """Ответ API без сети: статус меняется каждый цикл."""
+    return {
+        'homeworks': [{
+            'homework_name': 'hw',
+            'status': STATUSES[current_timestamp % 3],
+            'date_updated': '2020-02-13T14:40:57Z',
+        }],
+        'current_date': current_timestamp + 1,
+    }
+
+
+def run(cycles):
+    """Возвращает время одного цикла опроса, мкс."""
+    store = StateStore()
+    store.add('1', 'token', 0)
+    subscription = store['1']
+    bot = CollectingBot()
+    start = time.perf_counter()
+    for _ in range(cycles):
+        homework.process_subscription(bot, '1', subscription, fetch=fetch)
+    return (time.perf_counter() - start) / cycles * 10 ** 6
+
+
+def main():
+    """Сравнивает цикл без трассировки и с разной долей выборки."""
+    cycles = int(sys.argv[1]) if len(sys.argv) > 1 else CYCLES
+    logging.disable(logging.CRITICAL)
+    baseline = run(cycles)
+    print(f'Без трассировки: {baseline:.2f} мкс/цикл')
+    with tempfile.TemporaryDirectory() as directory:
+        for sample_rate in (0.01, 0.1, 1.0):
+            homework.TRACER = tracing.Tracer(
+                os.path.join(directory, f'{sample_rate}.jsonl'), sample_rate
+            )
+            result = run(cycles)
+            homework.TRACER.close()
+            print(f'Выборка {sample_rate:>4}: {result:.2f} мкс/цикл '
+                  f'(+{result - baseline:.2f})')
+    homework.TRACER = None
+
+
+if __name__ == '__main__':
+    main()
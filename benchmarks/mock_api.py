@@ -0,0 +1,128 @@
+"""
+Локальный сервер, имитирующий API Практикума для бенчмарков и тестов.
+
+Отдельный процесс: python -m benchmarks.mock_api [задержка, с]
+"""
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+PATH = '/api/user_api/homework_statuses/'
+STATUSES = ('reviewing', 'rejected', 'approved')
+
+
+class MockServer(ThreadingHTTPServer):
+    """HTTP-сервер с очередью соединений для сотен параллельных клиентов."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        """Не печатает обрывы соединений клиентами по таймауту."""
+
+
+class MockPracticumAPI:
+    """
+    Имитирует API Практикума.
+    Каждый change_every-й запрос с токеном возвращает смену статуса,
+    остальные - пустой список работ. Токены, начинающиеся с `invalid`,
+    получают 401. fault(token) может вернуть (status, body) вместо ответа.
+    """
+
+    def __init__(self, latency=0.0, change_every=3, fault=None):
+        """Создаёт сервер. Запускается методом start()."""
+        self.latency = latency
+        self.change_every = change_every
+        self.fault = fault
+        self.counters = {}
+        self.lock = threading.Lock()
+        self.server = None
+        self.url = None
+
+    def respond(self, token, params):
+        """
+        Возвращает (status, data) для запроса с токеном.
+        params - параметры запроса, например from_date.
+        """
+        if token.startswith('invalid'):
+            return 401, {'code': 'not_authenticated'}
+        with self.lock:
+            count = self.counters.get(token, 0) + 1
+            self.counters[token] = count
+        homeworks = []
+        if count % self.change_every == 0:
+            homeworks.append({
+                'homework_name': f'{token}_hw.zip',
+                'status': STATUSES[count // self.change_every % 3],
+                'date_updated': time.strftime(
+                    '%Y-%m-%dT%H:%M:%SZ', time.gmtime()
+                ),
+            })
+        return 200, {'homeworks': homeworks, 'current_date': int(time.time())}
+
+    def handler(self):
+        """Возвращает класс обработчика запросов."""
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                authorization = self.headers.get('Authorization', '')
+                token = authorization[len('OAuth '):]
+                if api.latency:
+                    time.sleep(api.latency)
+                result = api.fault(token) if api.fault else None
+                if result is None:
+                    query = parse_qs(urlsplit(self.path).query)
+                    params = {key: values[0] for key, values in query.items()}
+                    status, data = api.respond(token, params)
+                    body = json.dumps(data).encode()
+                else:
+                    status, body = result
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        """Запускает сервер в фоновом потоке. Возвращает адрес API."""
+        self.server = MockServer(('127.0.0.1', 0), self.handler())
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}{PATH}'
+        return self.url
+
+    def stop(self):
+        """Останавливает сервер."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def requests(self):
+        """Возвращает количество обработанных запросов с корректным токеном."""
+        with self.lock:
+            return sum(self.counters.values())
+
+
+def main():
+    """Запускает сервер и печатает адрес API."""
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.0
+    api = MockPracticumAPI(latency=latency)
+    print(api.start(), flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        api.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+import threading
+import time
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitBreaker:
+    """
+    Приостанавливает запросы к API после серии сбоев сервера.
+    После паузы cooldown пропускает один пробный запрос: успех закрывает
+    выключатель, неудача снова открывает его. Пока проба не завершилась,
+    остальные запросы отклоняются. Если о пробе не сообщили за cooldown
+    секунд, пропускается следующая.
+    """
+
+    def __init__(self, threshold=5, cooldown=300, clock=time.monotonic):
+        """Создаёт закрытый выключатель."""
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self.probe_at = None
+        self.state = CLOSED
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """Возвращает True, если запрос к API разрешён."""
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+            now = self.clock()
+            if (self.state == OPEN
+                    and now - self.opened_at >= self.cooldown):
+                self.state = HALF_OPEN
+                self.probe_at = None
+            if self.state == HALF_OPEN and (
+                    self.probe_at is None
+                    or now - self.probe_at >= self.cooldown):
+                self.probe_at = now
+                return True
+            return False
+
+    def success(self):
+        """Отмечает успешный ответ API."""
+        with self.lock:
+            self.failures = 0
+            self.probe_at = None
+            self.state = CLOSED
+
+    def failure(self):
+        """Отмечает сбой API. Открывает выключатель после threshold сбоев."""
+        with self.lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.threshold:
+                self.state = OPEN
+                self.opened_at = self.clock()
+                self.probe_at = None
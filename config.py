@@ -0,0 +1,158 @@
+import json
+import math
+import os
+from collections import namedtuple
+
+SETTINGS_KEYS = ('endpoint', 'retry_time', 'telegram_token')
+
+Config = namedtuple('Config', 'settings subscriptions')
+ConfigDiff = namedtuple(
+    'ConfigDiff', 'settings unset added removed changed'
+)
+
+
+def check_settings(settings):
+    """
+    Проверяет типы и значения настроек.
+    При ошибке вызывает ValueError.
+    """
+    endpoint = settings.get('endpoint', 'https://')
+    if (not isinstance(endpoint, str)
+            or not endpoint.startswith(('http://', 'https://'))):
+        raise ValueError(f'Некорректный endpoint: {endpoint!r}')
+    retry_time = settings.get('retry_time', 1)
+    if (isinstance(retry_time, bool)
+            or not isinstance(retry_time, (int, float))
+            or not math.isfinite(retry_time) or retry_time <= 0):
+        raise ValueError(f'Некорректный retry_time: {retry_time!r}')
+    telegram_token = settings.get('telegram_token', 'token')
+    if not isinstance(telegram_token, str) or not telegram_token:
+        raise ValueError('Некорректный telegram_token')
+
+
+def read_config_file(path):
+    """
+    Читает JSON-файл конфигурации.
+    Возвращает Config с настройками и подписками вида chat_id: token.
+    При некорректном содержимом вызывает ValueError.
+    """
+    with open(path, encoding='utf-8') as config_file:
+        data = json.load(config_file)
+    if not isinstance(data, dict):
+        raise ValueError(f'{path}: ожидается JSON-объект')
+    settings = {
+        key: data[key] for key in SETTINGS_KEYS if key in data
+    }
+    try:
+        check_settings(settings)
+    except ValueError as error:
+        raise ValueError(f'{path}: {error}')
+    subscriptions = data.get('subscriptions', {})
+    if not isinstance(subscriptions, dict):
+        raise ValueError(f'{path}: subscriptions должен быть JSON-объектом')
+    for chat_id, token in subscriptions.items():
+        if not isinstance(token, str) or not token:
+            raise ValueError(f'{path}: некорректный токен подписки {chat_id}')
+    subscriptions = {
+        str(chat_id): token for chat_id, token in subscriptions.items()
+    }
+    return Config(settings, subscriptions)
+
+
+def config_files(path):
+    """
+    Возвращает список файлов конфигурации.
+    Для директории - все *.json файлы в алфавитном порядке.
+    """
+    if not os.path.isdir(path):
+        return [path]
+    return sorted(
+        os.path.join(path, name) for name in os.listdir(path)
+        if name.endswith('.json')
+    )
+
+
+def load_config(path):
+    """
+    Загружает конфигурацию из файла или директории.
+    Файлы директории объединяются: более поздние перекрывают ранние.
+    """
+    settings = {}
+    subscriptions = {}
+    for file_path in config_files(path):
+        config = read_config_file(file_path)
+        settings.update(config.settings)
+        subscriptions.update(config.subscriptions)
+    return Config(settings, subscriptions)
+
+
+def diff_config(old, new):
+    """
+    Сравнивает две конфигурации.
+    Возвращает ConfigDiff только с изменившимися настройками и подписками.
+    unset - настройки, удалённые из конфигурации.
+    """
+    settings = {
+        key: value for key, value in new.settings.items()
+        if old.settings.get(key) != value
+    }
+    unset = [key for key in old.settings if key not in new.settings]
+    old_subs = old.subscriptions
+    new_subs = new.subscriptions
+    added = {
+        chat_id: token for chat_id, token in new_subs.items()
+        if chat_id not in old_subs
+    }
+    removed = [chat_id for chat_id in old_subs if chat_id not in new_subs]
+    changed = {
+        chat_id: token for chat_id, token in new_subs.items()
+        if chat_id in old_subs and old_subs[chat_id] != token
+    }
+    return ConfigDiff(settings, unset, added, removed, changed)
+
+
+class ConfigWatcher:
+    """
+    Следит за файлом или директорией конфигурации.
+    Изменения определяются по mtime и размеру файлов, поэтому проверка
+    не блокирует цикл опроса и не перечитывает неизменённые файлы.
+    """
+
+    def __init__(self, path):
+        """Запоминает путь к файлу или директории конфигурации."""
+        self.path = path
+        self.signature = None
+        self.config = Config({}, {})
+
+    def snapshot(self):
+        """Возвращает отпечаток состояния файлов конфигурации."""
+        signature = []
+        for file_path in config_files(self.path):
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                continue
+            signature.append((file_path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def poll(self):
+        """
+        Проверяет, изменилась ли конфигурация.
+        Возвращает ConfigDiff или None, если изменений нет.
+        """
+        signature = self.snapshot()
+        if signature == self.signature:
+            return None
+        config = load_config(self.path)
+        self.signature = signature
+        diff = diff_config(self.config, config)
+        self.config = config
+        return diff
+
+    def reset(self, config):
+        """
+        Возвращает прежнюю конфигурацию, если изменения не применены.
+        Файлы будут перечитаны при следующей проверке.
+        """
+        self.config = config
+        self.signature = None
@@ -0,0 +1,280 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import tracing
+
+logger = logging.getLogger('homework_logger')
+
+STOP = object()
+
+
+class SendLane:
+    """
+    Очередь отправки сообщений с отдельным потоком.
+    Все сообщения одного чата попадают в одну очередь, поэтому
+    доставляются в том порядке, в котором были сформированы.
+    """
+
+    def __init__(self, name, poller, queue_size):
+        """Создаёт очередь. Поток запускается методом start()."""
+        self.name = name
+        self.poller = poller
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.current = None
+
+    def start(self):
+        """
+        Запускает новый поток отправки. Прежний поток завершится сам.
+        Сообщение, которое отправлял прежний (зависший) поток, передаётся
+        новому и отправляется первым, поэтому порядок сообщений чата
+        не нарушается.
+        """
+        with self.lock:
+            self.generation += 1
+            generation = self.generation
+            handover = self.current
+        thread = threading.Thread(
+            target=self.run, args=(generation, handover), daemon=True,
+            name=self.name
+        )
+        thread.start()
+
+    def run(self, generation, delivery=None):
+        """
+        Отправляет сообщения из очереди, пока поток актуален.
+        delivery - сообщение, переданное от прежнего потока.
+        """
+        while True:
+            if delivery is None:
+                delivery = self.take(generation)
+                if delivery is STOP:
+                    return
+                if delivery is None:
+                    continue
+            if not self.send(generation, delivery):
+                return
+            self.queue.task_done()
+            delivery = None
+
+    def take(self, generation):
+        """
+        Берёт следующее сообщение из очереди.
+        Ожидание пустой очереди не считается зависанием, сторожевой
+        поток следит только за отправкой.
+        Возвращает None, если очередь пуста, и STOP, если поток
+        нужно завершить. Устаревший поток возвращает взятое сообщение
+        в очередь.
+        """
+        health = self.poller.health
+        if generation != self.generation:
+            return STOP
+        if health is not None:
+            health.idle(self.name)
+        try:
+            delivery = self.queue.get(timeout=self.poller.beat_interval)
+        except queue.Empty:
+            return None
+        if health is not None:
+            health.beat(self.name, self.poller.beat_interval)
+        with self.lock:
+            stale = generation != self.generation
+            if not stale and delivery is not STOP:
+                self.current = delivery
+        if stale and delivery is not STOP:
+            self.queue.put(delivery)
+        if stale or delivery is STOP:
+            self.queue.task_done()
+            return STOP
+        return delivery
+
+    def send(self, generation, delivery):
+        """
+        Отправляет сообщение, повторяя попытку при ошибке.
+        Пауза между попытками - время из ответа Telegram 429 или
+        retry_delay - задерживает только эту очередь.
+        Если попытки исчерпаны, состояние подписки не меняется
+        и сообщение будет сформировано заново при следующем опросе.
+        Возвращает False, если поток устарел и сообщение передано новому.
+        """
+        poller = self.poller
+        with tracing.resume(delivery.trace):
+            for attempt in range(1, poller.send_attempts + 1):
+                error = poller.deliver(poller.bot, delivery)
+                if error is None or attempt == poller.send_attempts:
+                    break
+                delay = getattr(error, 'retry_after', None)
+                delay = delay or poller.retry_delay
+                if poller.health is not None:
+                    poller.health.beat(
+                        self.name, delay + poller.beat_interval
+                    )
+                time.sleep(delay)
+        with self.lock:
+            if generation != self.generation:
+                return False
+            self.current = None
+        if error is not None:
+            logger.error(
+                f'Сообщение для чата {delivery.chat_id} не отправлено, '
+                'оно будет сформировано при следующем опросе.'
+            )
+        poller.completed.put((delivery, error is None))
+        return True
+
+
+class ConcurrentPoller:
+    """
+    Выполняет опрос подписок на ограниченных пулах потоков.
+    Запросы к API выполняются параллельно в fetch_workers потоках,
+    отправка - в send_workers очередях по одной на группу чатов.
+    Состояние подписки сохраняется в потоке опроса после того, как очередь
+    подтвердила отправку. Пока сообщение не отправлено, подписка
+    не опрашивается, поэтому у чата не больше одного сообщения в очереди.
+    Опрос, отправка и сохранение состояния выполняются функциями
+    process(bot, chat_id, subscription, fetch, send), deliver(bot, delivery)
+    и commit(delivery) запущенного модуля бота.
+    """
+
+    def __init__(self, bot, process, deliver, commit, fetch_workers=8,
+                 send_workers=4, queue_size=100, health=None,
+                 beat_interval=5, send_attempts=3, retry_delay=1,
+                 poll_timeout=30):
+        """Создаёт пулы потоков и запускает очереди отправки."""
+        self.bot = bot
+        self.process = process
+        self.deliver = deliver
+        self.commit = commit
+        self.poll_timeout = poll_timeout
+        self.send_attempts = send_attempts
+        self.retry_delay = retry_delay
+        self.health = health
+        self.beat_interval = beat_interval
+        self.fetch_pool = ThreadPoolExecutor(
+            fetch_workers, thread_name_prefix='fetch'
+        )
+        self.fetch_slots = threading.BoundedSemaphore(
+            fetch_workers + queue_size
+        )
+        self.lanes = [
+            SendLane(f'send-{index}', self, queue_size)
+            for index in range(send_workers)
+        ]
+        self.pending = set()
+        self.completed = queue.SimpleQueue()
+        for lane in self.lanes:
+            lane.start()
+
+    def lane(self, chat_id):
+        """Возвращает очередь отправки для чата."""
+        return self.lanes[hash(chat_id) % len(self.lanes)]
+
+    def queue_depth(self):
+        """Возвращает количество сообщений, ожидающих отправки."""
+        return sum(lane.queue.qsize() for lane in self.lanes)
+
+    def send(self, bot, delivery):
+        """
+        Ставит сообщение в очередь отправки чата.
+        Если очередь заполнена, опрос ждёт (backpressure). Ожидание
+        отмечается в health, чтобы сторожевой поток не счёл опрос
+        зависшим, пока очередь разбирает ответы 429.
+        """
+        if delivery.message is None:
+            self.completed.put((delivery, True))
+            return
+        if delivery.trace is not None:
+            delivery.trace.detach()
+        self.pending.add(delivery.chat_id)
+        lane = self.lane(delivery.chat_id)
+        while True:
+            try:
+                lane.queue.put(delivery, timeout=self.beat_interval)
+                return
+            except queue.Full:
+                if self.health is not None:
+                    self.health.beat('poll', self.poll_timeout)
+
+    def commit_delivered(self):
+        """
+        Сохраняет состояние подписок, сообщения которых отправлены.
+        Подписки с неотправленными сообщениями будут опрошены снова.
+        """
+        while True:
+            try:
+                delivery, sent = self.completed.get_nowait()
+            except queue.Empty:
+                return
+            self.pending.discard(delivery.chat_id)
+            if not sent:
+                continue
+            try:
+                self.commit(delivery)
+            except KeyError:
+                logger.info(
+                    f'Подписка {delivery.chat_id} удалена до отправки '
+                    'сообщения.'
+                )
+
+    def submit(self, chat_id, subscription, fetch):
+        """
+        Ставит опрос подписки в пул запросов.
+        Если пул и его очередь заполнены, ждёт освобождения места.
+        """
+        self.fetch_slots.acquire()
+        future = self.fetch_pool.submit(
+            self.process, self.bot, chat_id, subscription, fetch, self.send
+        )
+        future.add_done_callback(self.fetch_done)
+        return future
+
+    def fetch_done(self, future):
+        """Освобождает место в пуле и отмечает, что опрос не завис."""
+        self.fetch_slots.release()
+        if self.health is not None:
+            self.health.beat('poll', self.poll_timeout)
+
+    def poll(self, subscriptions, fetch=None):
+        """
+        Опрашивает все подписки и ждёт окончания запросов.
+        Следующий цикл начинается только после этого, поэтому одна подписка
+        не опрашивается одновременно в двух потоках.
+        Подписки, сообщения которых ещё в очереди, пропускаются.
+        Возвращает количество подписок с корректным ответом API.
+        """
+        self.commit_delivered()
+        futures = {
+            self.submit(chat_id, subscription, fetch): chat_id
+            for chat_id, subscription in subscriptions
+            if chat_id not in self.pending
+        }
+        wait(futures)
+        self.commit_delivered()
+        answered = 0
+        for future, chat_id in futures.items():
+            if future.exception() is not None:
+                logger.error(
+                    f'Сбой опроса подписки {chat_id}: {future.exception()}'
+                )
+            elif future.result():
+                answered += 1
+                if self.health is not None:
+                    self.health.poll_succeeded(chat_id)
+        return answered
+
+    def join(self):
+        """Ждёт отправки всех сообщений и сохраняет состояние подписок."""
+        for lane in self.lanes:
+            lane.queue.join()
+        self.commit_delivered()
+
+    def shutdown(self):
+        """Отправляет оставшиеся сообщения и останавливает потоки."""
+        self.fetch_pool.shutdown()
+        for lane in self.lanes:
+            lane.queue.put(STOP)
+        self.join()
@@ -0,0 +1,161 @@
+import json
+import logging
+import math
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger('homework_logger')
+
+
+class Health:
+    """
+    Состояние работоспособности бота.
+    Цикл опроса только обновляет поля под блокировкой, а HTTP-сервер
+    и сторожевой поток читают снимок, не задерживая опрос.
+    Время успешного опроса хранится по shards шардам подписок, шард
+    определяется по chat_id одинаково при любом способе опроса.
+    """
+
+    def __init__(self, clock=time.monotonic, shards=8):
+        """Создаёт пустое состояние."""
+        self.clock = clock
+        self.shards = shards
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.last_success = {}
+        self.lag = 0.0
+        self.gauges = {}
+
+    def beat(self, stage, expected):
+        """
+        Отмечает, что этап stage жив.
+        Следующая отметка ожидается не позже чем через expected секунд.
+        """
+        with self.lock:
+            self.stages[stage] = (self.clock(), expected)
+
+    def idle(self, stage):
+        """Отмечает, что этап stage ждёт работы и зависнуть не может."""
+        with self.lock:
+            self.stages[stage] = (self.clock(), math.inf)
+
+    def shard(self, chat_id):
+        """Возвращает имя шарда подписки chat_id."""
+        index = zlib.crc32(str(chat_id).encode()) % self.shards
+        return f'shard-{index}'
+
+    def poll_succeeded(self, chat_id):
+        """Запоминает время успешного опроса API для шарда подписки."""
+        shard = self.shard(chat_id)
+        with self.lock:
+            self.last_success[shard] = time.time()
+
+    def set_lag(self, lag):
+        """Запоминает отставание планировщика от расписания."""
+        with self.lock:
+            self.lag = lag
+
+    def gauge(self, name, func):
+        """Регистрирует показатель, вычисляемый при запросе состояния."""
+        with self.lock:
+            self.gauges[name] = func
+
+    def stalled(self, grace):
+        """Возвращает этапы, пропустившие отметку больше чем на grace."""
+        now = self.clock()
+        with self.lock:
+            return [
+                stage for stage, (beat, expected) in self.stages.items()
+                if now - beat > expected + grace
+            ]
+
+    def snapshot(self, grace):
+        """Возвращает состояние в виде словаря для HTTP-ответа."""
+        stalled = self.stalled(grace)
+        with self.lock:
+            gauges = dict(self.gauges)
+            data = {
+                'live': not stalled,
+                'ready': bool(self.last_success),
+                'stalled_stages': stalled,
+                'last_success': dict(self.last_success),
+                'scheduler_lag': round(self.lag, 3),
+            }
+        for name, func in gauges.items():
+            data[name] = func()
+        return data
+
+
+def serve_health(health, port, grace, host='127.0.0.1'):
+    """
+    Запускает HTTP-сервер состояния в фоновом потоке.
+    /health - 200, если ни один этап не завис, иначе 503.
+    /ready - 200 после первого успешного опроса API, иначе 503.
+    """
+    class HealthHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            snapshot = health.snapshot(grace)
+            if self.path == '/health':
+                ok = snapshot['live']
+            elif self.path == '/ready':
+                ok = snapshot['ready'] and snapshot['live']
+            else:
+                self.send_error(404)
+                return
+            body = json.dumps(snapshot).encode()
+            self.send_response(200 if ok else 503)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), HealthHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+class Watchdog(threading.Thread):
+    """
+    Сторожевой поток: перезапускает этапы, переставшие отмечаться.
+    Для этапа без функции перезапуска только пишет в лог.
+    """
+
+    def __init__(self, health, grace, interval=10):
+        """Создаёт сторожевой поток. Запускается методом start()."""
+        super().__init__(daemon=True)
+        self.health = health
+        self.grace = grace
+        self.interval = interval
+        self.restarts = {}
+        self.stopped = threading.Event()
+
+    def watch(self, stage, restart):
+        """Регистрирует функцию перезапуска этапа."""
+        self.restarts[stage] = restart
+
+    def check(self):
+        """Перезапускает зависшие этапы. Возвращает их список."""
+        stalled = self.health.stalled(self.grace)
+        for stage in stalled:
+            logger.critical(f'Этап {stage} не отвечает, перезапуск.')
+            restart = self.restarts.get(stage)
+            if restart is not None:
+                restart()
+            self.health.beat(stage, self.grace)
+        return stalled
+
+    def run(self):
+        """Проверяет этапы каждые interval секунд."""
+        while not self.stopped.wait(self.interval):
+            self.check()
+
+    def stop(self):
+        """Останавливает сторожевой поток."""
+        self.stopped.set()
@@ -2,80 +2,154 @@ import logging
 import os
 import sys
 import time
+from collections import namedtuple
 from logging import StreamHandler
 
-import requests
 from dotenv import load_dotenv
-from telegram import Bot
 
+import tracing
+from alerts import ErrorAggregator
+from breaker import CircuitBreaker
+from config import ConfigWatcher
 from exceptions import (BadRequest, HomeworkStatusNotChange, TokenValueError,
                         WrongTypeAnswer)
+from state import StateStore, message_fingerprint, status_codes
 
 load_dotenv()
 logger = logging.getLogger('homework_logger')
-handler = StreamHandler(stream=sys.stdout)
-logger.addHandler(handler)
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s, %(levelname)s, %(message)s'
-)
 
 PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+CONFIG_PATH = os.getenv('BOT_CONFIG')
+RECORD_PATH = os.getenv('BOT_RECORD')
+RECORDER = None
+HEALTH_PORT = os.getenv('BOT_HEALTH_PORT')
+TRACE_PATH = os.getenv('BOT_TRACE')
+TRACE_SAMPLE = float(os.getenv('BOT_TRACE_SAMPLE', '0.1'))
+TRACER = None
+SESSION = None
+FETCH_WORKERS = int(os.getenv('BOT_FETCH_WORKERS', '0'))
+SEND_WORKERS = int(os.getenv('BOT_SEND_WORKERS', '4'))
 
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
-HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
 
 RETRY_TIME = 600
+REQUEST_TIMEOUT = 30
+# Значения настроек при запуске: возвращаются, если настройку удалили
+# из файла конфигурации.
+DEFAULT_SETTINGS = {
+    'endpoint': ENDPOINT,
+    'retry_time': RETRY_TIME,
+    'telegram_token': TELEGRAM_TOKEN,
+}
+WATCHDOG_GRACE = 120
+WATCHDOG_INTERVAL = 10
+BREAKER = CircuitBreaker()
+ALERT_WINDOW = 600
+ALERTS = None
 HOMEWORK_STATUSES = {
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
     'reviewing': 'Работа взята на проверку ревьюером.',
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
+STATUS_CODES = status_codes(HOMEWORK_STATUSES)
+
+Delivery = namedtuple(
+    'Delivery', 'chat_id subscription message changes date_updated trace'
+)
+
+
+def configure_logging():
+    """Настраивает вывод логов в stdout. Вызывается при запуске бота."""
+    handler = StreamHandler(stream=sys.stdout)
+    logger.addHandler(handler)
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format='%(asctime)s, %(levelname)s, %(message)s'
+    )
 
 
 def send_message(bot, message):
+    """Направляет сообщение в телеграмм-чат TELEGRAM_CHAT_ID."""
+    return send_message_to(bot, TELEGRAM_CHAT_ID, message)
+
+
+def send_message_to(bot, chat_id, message):
     """
-    Направляет сообщение в телеграмм-чат. Логирует успешную отправку.
+    Направляет сообщение в телеграмм-чат chat_id. Логирует успешную отправку.
     Логирует ошибку в противоположном случае.
+    Возвращает ошибку отправки или None, если сообщение отправлено.
     """
     try:
-        bot.send_message(TELEGRAM_CHAT_ID, message)
+        bot.send_message(chat_id, message)
     except Exception as error:
         logging.error(
             f'Не удалось отправить сообщение. {error}'
         )
-    else:
-        logger.info(
-            f'Бот отправил сообщение: {message}'
-        )
+        return error
+    logger.info(
+        f'Бот отправил сообщение: {message}'
+    )
+    return None
 
 
 def get_api_answer(current_timestamp):
+    """Выполняет запрос к API с токеном PRACTICUM_TOKEN."""
+    return request_homework_statuses(current_timestamp, PRACTICUM_TOKEN)
+
+
+def request_homework_statuses(current_timestamp, practicum_token):
     """
     Выполняет запрос к API. Проверяет статус ответа.В случае ошибки - логирует.
     Возвращает преобразованную Json - строку.
+    Если включена запись трафика (RECORDER), сохраняет сырой ответ.
+    После серии сбоев сервера запросы приостанавливаются (BREAKER).
+    Если задана сессия SESSION, соединения переиспользуются.
     """
+    import requests
+
+    if not BREAKER.allow():
+        raise BadRequest('API недоступен, запросы временно приостановлены.')
     timestamp = current_timestamp or int(time.time())
     params = {'from_date': timestamp}
+    start = time.monotonic()
     try:
-        response = requests.get(
-            ENDPOINT,
-            headers=HEADERS,
-            params=params
-        )
+        with tracing.span('fetch'):
+            response = (SESSION or requests).get(
+                ENDPOINT,
+                headers={'Authorization': f'OAuth {practicum_token}'},
+                params=params,
+                timeout=REQUEST_TIMEOUT
+            )
     except requests.exceptions.RequestException as error:
+        BREAKER.failure()
+        if RECORDER is not None:
+            RECORDER.record_error(params, error, time.monotonic() - start)
         error_message = ('Нет возможности получить информацию с сервера. '
                          f'Ошибка: {error}.')
         raise BadRequest(error_message)
+    if RECORDER is not None:
+        RECORDER.record(params, response, time.monotonic() - start)
+    if response.status_code >= 500:
+        BREAKER.failure()
+    else:
+        BREAKER.success()
+    return parse_api_response(response)
+
+
+def parse_api_response(response):
+    """
+    Проверяет статус ответа API.
+    Возвращает преобразованную Json - строку.
+    """
     status_code = response.status_code
     if status_code != 200:
         error_message = ('Нет возможности получить информацию с сервера, '
                          f'status_code запроса: {status_code}.')
         raise BadRequest(error_message)
-    response = response.json()
-    return response
+    with tracing.span('decode'):
+        return response.json()
 
 
 def check_response(response):
@@ -98,6 +172,22 @@ def check_response(response):
         raise WrongTypeAnswer(error_message)
 
 
+def response_timestamp(response):
+    """
+    Возвращает current_date из ответа API для следующего запроса.
+    Если значение отсутствует или не помещается в колонку состояния,
+    возвращает текущее время.
+    """
+    current_date = response.get('current_date')
+    if (isinstance(current_date, int) and not isinstance(current_date, bool)
+            and 0 <= current_date < 2 ** 63):
+        return current_date
+    logging.warning(
+        f'Некорректный current_date в ответе API: {current_date!r}'
+    )
+    return int(time.time())
+
+
 def parse_status(homework):
     """Возвращает сообщение об изменении status."""
     homework_status = homework['status']
@@ -130,37 +220,271 @@ def check_tokens():
     return True
 
 
+def changed_settings(diff):
+    """
+    Возвращает новые значения изменившихся настроек.
+    Удалённые из конфигурации настройки получают значения DEFAULT_SETTINGS.
+    """
+    settings = {key: DEFAULT_SETTINGS[key] for key in diff.unset}
+    settings.update(diff.settings)
+    return settings
+
+
+def apply_config(diff, subscriptions):
+    """
+    Применяет изменения конфигурации к работающему боту.
+    Изменяются только затронутые подписки, остальные сохраняют состояние.
+    Возвращает True, если изменился TELEGRAM_TOKEN.
+    """
+    global ENDPOINT, RETRY_TIME, TELEGRAM_TOKEN
+    settings = changed_settings(diff)
+    ENDPOINT = settings.get('endpoint', ENDPOINT)
+    RETRY_TIME = settings.get('retry_time', RETRY_TIME)
+    TELEGRAM_TOKEN = settings.get('telegram_token', TELEGRAM_TOKEN)
+    for chat_id in diff.removed:
+        subscriptions.remove(chat_id)
+    for chat_id, practicum_token in diff.added.items():
+        subscriptions.add(chat_id, practicum_token, int(time.time()))
+    for chat_id, practicum_token in diff.changed.items():
+        subscriptions[chat_id]['practicum_token'] = practicum_token
+    if diff.added or diff.removed or diff.changed or settings:
+        logger.info(
+            f'Конфигурация обновлена: добавлено {len(diff.added)}, '
+            f'удалено {len(diff.removed)}, изменено {len(diff.changed)} '
+            f'подписок, настройки: {sorted(settings)}'
+        )
+    return 'telegram_token' in settings
+
+
+def reload_config(watcher, subscriptions, bot):
+    """
+    Проверяет файл конфигурации и применяет изменения.
+    Ошибка чтения или некорректные настройки не останавливают бота:
+    сохраняется прежняя конфигурация.
+    Возвращает бота, нового - если изменился TELEGRAM_TOKEN.
+    """
+    from telegram import Bot
+
+    previous = watcher.config
+    try:
+        diff = watcher.poll()
+        if diff is None:
+            return bot
+        telegram_token = changed_settings(diff).get('telegram_token')
+        new_bot = Bot(token=telegram_token) if telegram_token else bot
+    except Exception as error:
+        watcher.reset(previous)
+        logging.error(f'Не удалось загрузить конфигурацию: {error}')
+        return bot
+    apply_config(diff, subscriptions)
+    return new_bot
+
+
+def process_subscription(bot, chat_id, subscription, fetch=None, send=None):
+    """
+    Выполняет один цикл опроса API для подписки.
+    Отправляет сообщение в её чат, если оно изменилось.
+    fetch(current_timestamp, practicum_token) - источник ответов API,
+    по умолчанию запрос к ENDPOINT.
+    send(bot, delivery) - отправка в другом потоке (очереди executor);
+    по умолчанию сообщение отправляется сразу.
+    Возвращает True, если API вернул корректный ответ.
+    """
+    with tracing.trace(TRACER, chat_id=chat_id) as trace:
+        return poll_subscription(
+            bot, chat_id, subscription, fetch or request_homework_statuses,
+            trace, send
+        )
+
+
+def poll_subscription(bot, chat_id, subscription, fetch, trace, send=None):
+    """
+    Опрашивает API и отправляет сообщение в рамках трассы trace.
+    Если включена сводка ошибок (ALERTS), о сбоях сообщается не в чат
+    подписки, а в сводке для TELEGRAM_CHAT_ID.
+    Состояние подписки меняется только после отправки сообщения:
+    если отправка не удалась, статус будет запрошен и отправлен снова.
+    """
+    old_fingerprint = subscription['message_fingerprint']
+    answered = True
+    date_updated = None
+    changes = {}
+    try:
+        response = fetch(
+            subscription['current_timestamp'],
+            subscription['practicum_token']
+        )
+        with tracing.span('check_response'):
+            homeworks = check_response(response)
+        with tracing.span('parse_status'):
+            message = parse_status(homeworks[0])
+        old_fingerprint = None
+        date_updated = homeworks[0].get('date_updated')
+        changes['status'] = STATUS_CODES[homeworks[0]['status']]
+        changes['current_timestamp'] = response_timestamp(response)
+    except HomeworkStatusNotChange as error:
+        logging.debug(
+            'Отсутствие нового статуса домашней работы.'
+            f'Ошибка: {error}'
+        )
+        message = f'Отсутствие нового статуса домашней работы: {error}'
+    except Exception as error:
+        logging.error(
+            f'Сбой в работе программы: {error}'
+        )
+        if ALERTS is not None:
+            ALERTS.add(error, chat_id)
+            return False
+        message = f'Сбой в работе программы: {error}'
+        answered = False
+    fingerprint = message_fingerprint(message)
+    changes['message_fingerprint'] = fingerprint
+    if old_fingerprint == fingerprint:
+        message = None
+    delivery = Delivery(
+        chat_id, subscription, message, changes, date_updated, trace
+    )
+    if send is not None:
+        send(bot, delivery)
+    elif deliver(bot, delivery) is None:
+        commit_delivery(delivery)
+    return answered
+
+
+def deliver(bot, delivery):
+    """
+    Отправляет сообщение доставки, если оно есть.
+    Отмечает в трассе задержку от смены статуса до доставки.
+    Возвращает ошибку отправки или None.
+    """
+    if delivery.message is None:
+        return None
+    with tracing.span('send'):
+        error = send_message_to(bot, delivery.chat_id, delivery.message)
+    if (error is None and delivery.trace is not None
+            and delivery.date_updated):
+        delivery.trace.delivered(delivery.date_updated)
+    return error
+
+
+def commit_delivery(delivery):
+    """Сохраняет изменения состояния подписки после отправки сообщения."""
+    for key, value in delivery.changes.items():
+        delivery.subscription[key] = value
+
+
+def report_errors(bot):
+    """Отправляет сводку ошибок в TELEGRAM_CHAT_ID, если окно истекло."""
+    alert = ALERTS.flush()
+    if alert is not None:
+        send_message(bot, alert)
+
+
+def restart_process():
+    """
+    Завершает процесс для перезапуска менеджером процессов (Procfile worker).
+    Зависший главный поток нельзя перезапустить изнутри процесса.
+    """
+    os._exit(1)
+
+
+def start_health():
+    """
+    Создаёт состояние работоспособности и сторожевой поток.
+    Если задан BOT_HEALTH_PORT, запускает HTTP-сервер состояния.
+    Возвращает состояние и сторожевой поток.
+    """
+    from health import Health, Watchdog, serve_health
+
+    health = Health(clock=time.monotonic)
+    health.gauge('breaker', lambda: BREAKER.state)
+    if HEALTH_PORT:
+        serve_health(health, int(HEALTH_PORT), WATCHDOG_GRACE)
+    watchdog = Watchdog(health, WATCHDOG_GRACE, WATCHDOG_INTERVAL)
+    watchdog.watch('poll', restart_process)
+    watchdog.start()
+    return health, watchdog
+
+
+def make_poller(bot, fetch_workers=8, send_workers=SEND_WORKERS, **options):
+    """
+    Создаёт пулы потоков, работающие с функциями этого модуля.
+    При запуске python homework.py это модуль __main__:
+    повторно импортированный homework не видит ALERTS, TRACER, BREAKER
+    и перезагруженную конфигурацию.
+    """
+    from executor import ConcurrentPoller
+
+    return ConcurrentPoller(
+        bot, process_subscription, deliver, commit_delivery,
+        fetch_workers, send_workers, poll_timeout=REQUEST_TIMEOUT, **options
+    )
+
+
+def start_poller(bot, health, watchdog):
+    """
+    Создаёт пулы потоков для опроса подписок (BOT_FETCH_WORKERS).
+    Зависшие очереди отправки перезапускаются сторожевым потоком.
+    """
+    poller = make_poller(bot, FETCH_WORKERS, health=health)
+    health.gauge('send_queue_depth', poller.queue_depth)
+    for lane in poller.lanes:
+        watchdog.watch(lane.name, lane.start)
+    return poller
+
+
+def poll_all(bot, subscriptions, health, poller):
+    """
+    Опрашивает все подписки: по очереди или на пулах потоков poller.
+    Каждый ответ API отмечается в health, чтобы сторожевой поток видел,
+    что цикл опроса не завис.
+    """
+    if poller is not None:
+        poller.bot = bot
+        poller.poll(subscriptions.items())
+        return
+    for chat_id, subscription in subscriptions.items():
+        if process_subscription(bot, chat_id, subscription):
+            health.poll_succeeded(chat_id)
+        health.beat('poll', REQUEST_TIMEOUT)
+
+
 def main():
     """Основная логика работы бота."""
+    from telegram import Bot
+
+    global RECORDER, TRACER, ALERTS
     run = check_tokens()
     if not run:
         raise TokenValueError('Отсутствует обязательная переменная окружения')
     bot = Bot(token=TELEGRAM_TOKEN)
-    current_timestamp = int(time.time())
-    old_message = None
+    if RECORD_PATH:
+        from traffic import Recorder
+        RECORDER = Recorder(RECORD_PATH)
+    if TRACE_PATH:
+        TRACER = tracing.Tracer(TRACE_PATH, TRACE_SAMPLE)
+    ALERTS = ErrorAggregator(window=ALERT_WINDOW, clock=time.monotonic)
+    subscriptions = StateStore()
+    subscriptions.add(str(TELEGRAM_CHAT_ID), PRACTICUM_TOKEN, int(time.time()))
+    watcher = ConfigWatcher(CONFIG_PATH) if CONFIG_PATH else None
+    health, watchdog = start_health()
+    poller = start_poller(bot, health, watchdog) if FETCH_WORKERS else None
     while True:
-        try:
-            response = get_api_answer(current_timestamp)
-            homeworks = check_response(response)
-            message = parse_status(homeworks[0])
-            old_message = None
-            current_timestamp = response['current_date']
-        except HomeworkStatusNotChange as error:
-            logging.debug(
-                'Отсутствие нового статуса домашней работы.'
-                f'Ошибка: {error}'
-            )
-            message = f'Отсутствие нового статуса домашней работы: {error}'
-        except Exception as error:
-            logging.error(
-                f'Сбой в работе программы: {error}'
-            )
-            message = f'Сбой в работе программы: {error}'
-        if old_message != message:
-            old_message = message
-            send_message(bot, message)
+        health.beat('poll', REQUEST_TIMEOUT)
+        if watcher:
+            bot = reload_config(watcher, subscriptions, bot)
+        poll_all(bot, subscriptions, health, poller)
+        report_errors(bot)
+        health.beat('poll', RETRY_TIME)
+        wake_at = time.monotonic() + RETRY_TIME
         time.sleep(RETRY_TIME)
+        health.set_lag(time.monotonic() - wake_at)
 
 
 if __name__ == '__main__':
-    main()
+    if '--profile-startup' in sys.argv:
+        from startup import profile_startup
+        profile_startup()
+    else:
+        configure_logging()
+        main()
@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+
+BOT_DIR = os.path.dirname(os.path.abspath(__file__))
+FIRST_USE_MODULES = ('homework', 'requests', 'telegram')
+
+
+def import_times(modules=FIRST_USE_MODULES):
+    """
+    Импортирует модули в отдельном процессе с `-X importtime`.
+    Процесс запускается в директории бота, чтобы его модули находились
+    при любой текущей директории.
+    Возвращает список (собственное время, общее время, модуль) в мкс.
+    """
+    code = '; '.join(f'import {module}' for module in modules)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=BOT_DIR, capture_output=True, text=True, check=True
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times.append((int(self_us), int(cumulative_us), name.strip()))
+    return times
+
+
+def profile_startup(modules=FIRST_USE_MODULES, limit=20):
+    """
+    Печатает время импорта модулей бота и его тяжёлых зависимостей.
+    `homework` импортируется первым, поэтому время `requests` и `telegram`
+    показывает, сколько стоит их загрузка при первом использовании.
+    """
+    times = import_times(modules)
+    print('Время импорта при первом использовании, мс:')
+    for self_us, cumulative_us, name in times:
+        if name in modules:
+            print(f'  {name:<40} {cumulative_us / 1000:8.1f}')
+    print(f'Самые медленные модули (собственное время), топ-{limit}, мс:')
+    for self_us, cumulative_us, name in sorted(times, reverse=True)[:limit]:
+        print(
+            f'  {name:<40} {self_us / 1000:8.1f} '
+            f'(всего {cumulative_us / 1000:.1f})'
+        )
@@ -0,0 +1,126 @@
+from array import array
+
+NO_STATUS = 0
+NO_MESSAGE = 0
+FINGERPRINT_MASK = 2 ** 64 - 1
+
+
+def status_codes(statuses):
+    """
+    Возвращает коды статусов для колонки состояния.
+    Коды строятся по словарю статусов бота, поэтому новый статус
+    получает код без изменений в хранилище.
+    """
+    codes = {None: NO_STATUS}
+    for code, status in enumerate(statuses, start=1):
+        codes[status] = code
+    return codes
+
+
+def message_fingerprint(message):
+    """
+    Возвращает 64-битный отпечаток сообщения вместо его полного текста.
+    Отпечаток действителен только в пределах процесса: состояние
+    хранится в памяти, поэтому рандомизация hash() не мешает.
+    """
+    if message is None:
+        return NO_MESSAGE
+    return (hash(message) & FINGERPRINT_MASK) or 1
+
+
+class TenantState:
+    """
+    Состояние одной подписки в StateStore.
+    Поддерживает доступ по ключам, как словарь, но данные хранит в колонках.
+    """
+
+    __slots__ = ('store', 'chat_id')
+
+    def __init__(self, store, chat_id):
+        """Связывает представление с подпиской в хранилище."""
+        self.store = store
+        self.chat_id = chat_id
+
+    def __getitem__(self, key):
+        """Возвращает значение поля подписки."""
+        return self.store.get_field(self.chat_id, key)
+
+    def __setitem__(self, key, value):
+        """Изменяет значение поля подписки."""
+        self.store.set_field(self.chat_id, key, value)
+
+
+class StateStore:
+    """
+    Компактное хранилище состояния подписок.
+    Каждое поле - отдельная колонка: array для чисел и list для токенов.
+    Удаление переносит последнюю подписку на место удалённой.
+    """
+
+    def __init__(self):
+        """Создаёт пустые колонки."""
+        self.index = {}
+        self.chat_ids = []
+        self.tokens = []
+        self.timestamps = array('q')
+        self.fingerprints = array('Q')
+        self.statuses = array('B')
+        self.columns = {
+            'practicum_token': self.tokens,
+            'current_timestamp': self.timestamps,
+            'message_fingerprint': self.fingerprints,
+            'status': self.statuses,
+        }
+
+    def __len__(self):
+        """Возвращает количество подписок."""
+        return len(self.chat_ids)
+
+    def __contains__(self, chat_id):
+        """Проверяет, есть ли подписка для чата."""
+        return chat_id in self.index
+
+    def __getitem__(self, chat_id):
+        """Возвращает состояние подписки."""
+        if chat_id not in self.index:
+            raise KeyError(chat_id)
+        return TenantState(self, chat_id)
+
+    def add(self, chat_id, practicum_token, current_timestamp):
+        """Добавляет подписку или сбрасывает состояние существующей."""
+        if chat_id in self.index:
+            self.remove(chat_id)
+        self.index[chat_id] = len(self.chat_ids)
+        self.chat_ids.append(chat_id)
+        self.tokens.append(practicum_token)
+        self.timestamps.append(current_timestamp)
+        self.fingerprints.append(NO_MESSAGE)
+        self.statuses.append(NO_STATUS)
+
+    def remove(self, chat_id):
+        """Удаляет подписку, если она есть."""
+        position = self.index.pop(chat_id, None)
+        if position is None:
+            return
+        last = len(self.chat_ids) - 1
+        if position != last:
+            self.chat_ids[position] = self.chat_ids[last]
+            self.index[self.chat_ids[position]] = position
+            for column in self.columns.values():
+                column[position] = column[last]
+        self.chat_ids.pop()
+        for column in self.columns.values():
+            column.pop()
+
+    def get_field(self, chat_id, key):
+        """Возвращает значение поля подписки."""
+        return self.columns[key][self.index[chat_id]]
+
+    def set_field(self, chat_id, key, value):
+        """Изменяет значение поля подписки."""
+        self.columns[key][self.index[chat_id]] = value
+
+    def items(self):
+        """Возвращает пары (chat_id, состояние) для всех подписок."""
+        return [(chat_id, TenantState(self, chat_id))
+                for chat_id in self.chat_ids]
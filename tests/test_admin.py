@@ -0,0 +1,132 @@
+import json
+
+import admin
+import homework
+from benchmarks.mock_api import MockPracticumAPI
+from breaker import CircuitBreaker
+
+
+def write_rows(path):
+    path.write_text(
+        'chat_id,practicum_token\n'
+        '1,token-1\n'
+        '2,invalid-2\n'
+        'abc,token-3\n'
+        '4,\n'
+        '1,token-5\n'
+        '-6,token-6\n',
+        encoding='utf-8'
+    )
+
+
+class TestAdmin:
+
+    def test_parse_rows(self, tmp_path):
+        path = tmp_path / 'students.csv'
+        write_rows(path)
+        subscriptions, errors = admin.parse_rows(admin.read_rows(str(path)))
+        assert subscriptions == {
+            '1': 'token-1', '2': 'invalid-2', '-6': 'token-6'
+        }
+        assert [number for number, _ in errors] == [4, 5, 6], (
+            'Проверьте, что некорректные строки попадают в отчёт '
+            'с номерами строк файла'
+        )
+
+        jsonl = tmp_path / 'students.jsonl'
+        jsonl.write_text(
+            json.dumps({'chat_id': 7, 'practicum_token': 'token-7'}) + '\n',
+            encoding='utf-8'
+        )
+        assert admin.parse_rows(admin.read_rows(str(jsonl)))[0] == {
+            '7': 'token-7'
+        }
+
+    def test_parse_malformed_jsonl(self, tmp_path):
+        jsonl = tmp_path / 'students.jsonl'
+        jsonl.write_text(
+            json.dumps({'chat_id': 1, 'practicum_token': 'token-1'}) + '\n'
+            '{"chat_id": 2,\n'
+            '\n'
+            '[3, "token-3"]\n'
+            '"text"\n'
+            + json.dumps({'chat_id': 6, 'practicum_token': 'token-6'}) + '\n',
+            encoding='utf-8'
+        )
+        subscriptions, errors = admin.parse_rows(admin.read_rows(str(jsonl)))
+        assert subscriptions == {'1': 'token-1', '6': 'token-6'}, (
+            'Убедитесь, что некорректная строка JSONL не прерывает импорт'
+        )
+        assert [number for number, _ in errors] == [2, 4, 5]
+        assert errors[0][1].startswith('некорректный JSON')
+        assert errors[1][1] == 'ожидался объект, получено: list'
+
+    def test_dry_run_keeps_breaker(self, monkeypatch):
+        api = MockPracticumAPI(fault=lambda token: (502, b'Bad Gateway'))
+        monkeypatch.setattr(homework, 'ENDPOINT', api.start())
+        breaker = CircuitBreaker()
+        monkeypatch.setattr(homework, 'BREAKER', breaker)
+        subscriptions = {
+            str(index): f'token-{index}' for index in range(20)
+        }
+        try:
+            messages = dict(admin.dry_run(subscriptions, workers=4))
+        finally:
+            api.stop()
+        assert all(
+            'status_code запроса: 502' in message
+            for message in messages.values()
+        ), 'Убедитесь, что сбои пробного опроса не открывают выключатель'
+        assert homework.BREAKER is breaker and breaker.state == 'closed', (
+            'Убедитесь, что пробный опрос не меняет выключатель бота'
+        )
+
+    def test_validate_and_dry_run(self, monkeypatch):
+        api = MockPracticumAPI(change_every=1)
+        monkeypatch.setattr(homework, 'ENDPOINT', api.start())
+        monkeypatch.setattr(homework, 'BREAKER', CircuitBreaker())
+        subscriptions = {
+            str(index): f'token-{index}' for index in range(50)
+        }
+        subscriptions['50'] = 'invalid-50'
+        try:
+            results = admin.validate(subscriptions, workers=8)
+            messages = dict(admin.dry_run(subscriptions, workers=8))
+        finally:
+            api.stop()
+        assert results['50'] == 'invalid'
+        assert sum(result == 'ok' for result in results.values()) == 50
+        assert len(messages) == 51
+        assert messages['0'].startswith('Изменился статус проверки работы')
+        assert 'status_code запроса: 401' in messages['50'], (
+            'Убедитесь, что пробный опрос показывает ошибку невалидного токена'
+        )
+        assert homework.SESSION is None
+
+    def test_import_merges_config(self, tmp_path):
+        path = tmp_path / 'bot.json'
+        path.write_text(json.dumps({
+            'retry_time': 60, 'subscriptions': {'1': 'old'}
+        }))
+        total = admin.import_subscriptions({'1': 'new', '2': 'b'}, str(path))
+        data = json.loads(path.read_text())
+        assert total == 2
+        assert data == {
+            'retry_time': 60, 'subscriptions': {'1': 'new', '2': 'b'}
+        }
+
+    def test_import_into_config_dir(self, tmp_path):
+        (tmp_path / 'bot.json').write_text(json.dumps({
+            'retry_time': 60, 'subscriptions': {'1': 'a'}
+        }))
+        total = admin.import_subscriptions({'2': 'b'}, str(tmp_path))
+        assert total == 2, (
+            'Убедитесь, что при импорте в директорию учитываются '
+            'все её файлы'
+        )
+        assert json.loads((tmp_path / admin.IMPORT_FILE).read_text()) == {
+            'subscriptions': {'2': 'b'}
+        }
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            'bot.json', admin.IMPORT_FILE
+        ]
@@ -0,0 +1,118 @@
+import homework
+from alerts import ErrorAggregator
+from benchmarks.mock_api import MockPracticumAPI
+from breaker import CircuitBreaker
+from exceptions import BadRequest, WrongTypeAnswer
+from state import StateStore
+from traffic import CollectingBot
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAlerts:
+
+    def test_groups_alternating_errors(self):
+        clock = FakeClock()
+        alerts = ErrorAggregator(window=600, clock=clock)
+        for index in range(3):
+            alerts.add(BadRequest(f'status_code запроса: 50{index}.'), '1')
+            alerts.add(WrongTypeAnswer('Недокументированный статус.'), '1')
+            alerts.add(BadRequest('status_code запроса: 500.'), '2')
+        assert alerts.flush() is None, (
+            'Убедитесь, что сводка отправляется только после окончания окна'
+        )
+        clock.now = 600
+        summary = alerts.flush()
+        lines = summary.splitlines()
+        assert len(lines) == 3, (
+            'Убедитесь, что ошибки группируются по классу и тексту'
+        )
+        assert lines[1].startswith('BadRequest x 6 (подписок: 2)')
+        assert lines[2].startswith('WrongTypeAnswer x 3 (подписок: 1)')
+
+        alerts.add(BadRequest('status_code запроса: 500.'), '1')
+        alerts.add(WrongTypeAnswer('Недокументированный статус.'), '1')
+        clock.now = 1200
+        assert alerts.flush() is None, (
+            'Убедитесь, что повторная сводка с теми же ошибками подавляется'
+        )
+        clock.now = 1800
+        assert alerts.flush() is None
+
+    def test_keeps_http_status_class(self):
+        clock = FakeClock()
+        alerts = ErrorAggregator(window=600, clock=clock)
+        alerts.add(BadRequest('status_code запроса: 502.'), '1')
+        alerts.add(BadRequest('status_code запроса: 503.'), '2')
+        alerts.add(BadRequest('status_code запроса: 401.'), '3')
+        assert len(alerts.groups) == 2, (
+            'Убедитесь, что ошибки 4xx и 5xx попадают в разные группы'
+        )
+        clock.now = 600
+        lines = alerts.flush().splitlines()
+        assert lines[1].startswith('BadRequest x 2 (подписок: 2)')
+        assert lines[2] == (
+            'BadRequest x 1 (подписок: 1): status_code запроса: 401.'
+        )
+
+    def test_bounded_groups(self):
+        clock = FakeClock()
+        alerts = ErrorAggregator(
+            window=1, max_groups=2, max_tenants=3, clock=clock
+        )
+        for index in range(10):
+            alerts.add(KeyError(f'key_{chr(97 + index)}'), str(index))
+        assert len(alerts.groups) == 2
+        clock.now = 1
+        summary = alerts.flush()
+        assert 'Прочие ошибки: 8' in summary
+        for index in range(5):
+            alerts.add(ValueError('error'), str(index))
+        assert len(alerts.groups['ValueError', 'error'].tenants) == 3
+        clock.now = 2
+        assert '(подписок: 3+)' in alerts.flush()
+
+    def test_simulated_outage(self, monkeypatch):
+        api = MockPracticumAPI(fault=lambda token: (502, b'Bad Gateway'))
+        monkeypatch.setattr(homework, 'ENDPOINT', api.start())
+        monkeypatch.setattr(homework, 'BREAKER', CircuitBreaker())
+        clock = FakeClock()
+        monkeypatch.setattr(
+            homework, 'ALERTS', ErrorAggregator(window=600, clock=clock)
+        )
+        store = StateStore()
+        for index in range(300):
+            store.add(str(index), f'token-{index}', 0)
+        tenants_bot = CollectingBot()
+        poller = homework.make_poller(tenants_bot, fetch_workers=16)
+        operator_bot = CollectingBot()
+        try:
+            for _ in range(3):
+                poller.poll(store.items())
+                clock.now += 600
+                homework.report_errors(operator_bot)
+        finally:
+            poller.shutdown()
+            api.stop()
+        assert tenants_bot.messages == [], (
+            'Убедитесь, что при сбое API подписчики не получают '
+            'сообщения об ошибке'
+        )
+        assert len(operator_bot.messages) == 1, (
+            'Убедитесь, что о сбое API отправляется одна сводка'
+        )
+        summary = operator_bot.messages[0][1]
+        assert 'status_code запроса: 502' in summary
+        assert 'API недоступен' in summary, (
+            'Убедитесь, что после серии сбоев запросы к API приостанавливаются'
+        )
+        counts = [int(line.split(' x ')[1].split()[0])
+                  for line in summary.splitlines()[1:]]
+        assert sum(counts) == 300
@@ -0,0 +1,160 @@
+import json
+import os
+import time
+
+from config import Config, ConfigWatcher, diff_config, load_config
+from state import StateStore
+
+
+def write_config(path, data):
+    with open(path, 'w', encoding='utf-8') as config_file:
+        json.dump(data, config_file)
+
+
+class TestConfig:
+
+    def test_load_config_directory(self, tmp_path):
+        write_config(tmp_path / '01.json', {
+            'retry_time': 300,
+            'subscriptions': {'1': 'token-1'}
+        })
+        write_config(tmp_path / '02.json', {
+            'retry_time': 60,
+            'subscriptions': {2: 'token-2'}
+        })
+        config = load_config(str(tmp_path))
+        assert config.settings == {'retry_time': 60}, (
+            'Проверьте, что более поздние файлы перекрывают настройки'
+        )
+        assert config.subscriptions == {'1': 'token-1', '2': 'token-2'}, (
+            'Проверьте, что подписки из всех файлов объединяются'
+        )
+
+    def test_diff_config_is_incremental(self):
+        old = Config(
+            {'retry_time': 600}, {'1': 'a', '2': 'b', '3': 'c'}
+        )
+        new = old._replace(
+            settings={'retry_time': 600, 'endpoint': 'http://localhost/'},
+            subscriptions={'1': 'a', '2': 'changed', '4': 'd'}
+        )
+        diff = diff_config(old, new)
+        assert diff.settings == {'endpoint': 'http://localhost/'}
+        assert diff.unset == []
+        assert diff.added == {'4': 'd'}
+        assert diff.removed == ['3']
+        assert diff.changed == {'2': 'changed'}
+
+    def test_diff_config_large_change_set(self):
+        old = Config(
+            {}, {str(i): f'token-{i}' for i in range(10000)}
+        )
+        new = old._replace(subscriptions={
+            str(i): f'token-{i}' for i in range(5000, 15000)
+        })
+        start = time.perf_counter()
+        diff = diff_config(old, new)
+        elapsed = time.perf_counter() - start
+        assert len(diff.added) == 5000 and len(diff.removed) == 5000
+        assert elapsed < 0.1, (
+            'Применение изменений на 10 тысяч подписок '
+            f'заняло слишком много времени: {elapsed:.3f} c'
+        )
+
+    def test_watcher_reports_only_changes(self, tmp_path):
+        path = tmp_path / 'bot.json'
+        write_config(path, {'subscriptions': {'1': 'a'}})
+        watcher = ConfigWatcher(str(path))
+        diff = watcher.poll()
+        assert diff.added == {'1': 'a'}
+        assert watcher.poll() is None, (
+            'Проверьте, что без изменений файла конфигурация не перечитывается'
+        )
+        write_config(path, {'subscriptions': {'1': 'a', '2': 'b'}})
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        diff = watcher.poll()
+        assert diff.added == {'2': 'b'} and not diff.removed
+
+    def test_apply_config(self):
+        import homework
+        from config import ConfigDiff
+
+        subscriptions = StateStore()
+        subscriptions.add('1', 'a', 0)
+        subscriptions['1']['message_fingerprint'] = 42
+        retry_time = homework.RETRY_TIME
+        try:
+            changed_token = homework.apply_config(
+                ConfigDiff({'retry_time': 5}, [], {'2': 'b'}, [], {'1': 'c'}),
+                subscriptions
+            )
+            assert homework.RETRY_TIME == 5
+        finally:
+            homework.RETRY_TIME = retry_time
+        assert not changed_token
+        assert subscriptions['1']['practicum_token'] == 'c'
+        assert subscriptions['1']['message_fingerprint'] == 42, (
+            'Проверьте, что изменение подписки сохраняет её состояние'
+        )
+        assert subscriptions['2']['practicum_token'] == 'b'
+
+    def test_reload_keeps_config_on_invalid_settings(
+            self, monkeypatch, tmp_path):
+        import homework
+
+        monkeypatch.setattr(homework, 'RETRY_TIME', 600)
+        monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', '1234:old')
+        path = tmp_path / 'bot.json'
+        write_config(path, {'subscriptions': {'1': 'a'}})
+        watcher = ConfigWatcher(str(path))
+        subscriptions = StateStore()
+        bot = object()
+        assert homework.reload_config(watcher, subscriptions, bot) is bot
+        for settings in (
+            {'retry_time': '600'},
+            {'retry_time': -1},
+            {'endpoint': 42},
+            {'telegram_token': 'not a token'},
+        ):
+            write_config(path, {**settings, 'subscriptions': {'2': 'b'}})
+            assert homework.reload_config(watcher, subscriptions, bot) is bot
+            assert homework.RETRY_TIME == 600
+            assert homework.TELEGRAM_TOKEN == '1234:old'
+            assert '2' not in subscriptions, (
+                f'Проверьте, что настройки {settings} не применяются'
+            )
+        write_config(path, {'retry_time': 60, 'subscriptions': {'2': 'b'}})
+        homework.reload_config(watcher, subscriptions, bot)
+        assert homework.RETRY_TIME == 60 and '2' in subscriptions, (
+            'Проверьте, что исправленный файл применяется после ошибки'
+        )
+
+    def test_reload_restores_removed_settings(self, monkeypatch, tmp_path):
+        import homework
+
+        monkeypatch.setattr(homework, 'ENDPOINT', homework.ENDPOINT)
+        monkeypatch.setattr(homework, 'RETRY_TIME', homework.RETRY_TIME)
+        monkeypatch.setattr(
+            homework, 'TELEGRAM_TOKEN', homework.TELEGRAM_TOKEN
+        )
+        path = tmp_path / 'bot.json'
+        write_config(path, {
+            'retry_time': 5, 'endpoint': 'http://localhost/',
+            'subscriptions': {'1': 'a'},
+        })
+        watcher = ConfigWatcher(str(path))
+        subscriptions = StateStore()
+        bot = object()
+        homework.reload_config(watcher, subscriptions, bot)
+        assert homework.RETRY_TIME == 5
+        write_config(path, {'subscriptions': {'1': 'a'}})
+        diff = watcher.poll()
+        assert sorted(diff.unset) == ['endpoint', 'retry_time']
+        homework.apply_config(diff, subscriptions)
+        assert homework.RETRY_TIME == homework.DEFAULT_SETTINGS['retry_time']
+        assert homework.ENDPOINT == homework.DEFAULT_SETTINGS['endpoint'], (
+            'Проверьте, что удалённые из файла настройки возвращаются '
+            'к значениям при запуске'
+        )
+        assert '1' in subscriptions
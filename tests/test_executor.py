@@ -0,0 +1,282 @@
+import json
+import logging
+import os
+import runpy
+import sys
+import threading
+import time
+
+import telegram
+import telegram.error
+
+import executor
+import health
+from benchmarks.mock_api import MockPracticumAPI
+import homework
+from homework import HOMEWORK_STATUSES, make_poller
+from state import StateStore
+from traffic import CollectingBot
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATUSES = ('reviewing', 'rejected', 'approved')
+
+
+def fetch(current_timestamp, practicum_token):
+    return {
+        'homeworks': [{
+            'homework_name': practicum_token,
+            'status': STATUSES[current_timestamp % 3],
+        }],
+        'current_date': current_timestamp + 1,
+    }
+
+
+class TestExecutor:
+
+    def test_messages_keep_order_per_chat(self):
+        store = StateStore()
+        for index in range(50):
+            store.add(str(index), f'hw{index}', 0)
+        bot = CollectingBot()
+        poller = make_poller(bot, fetch_workers=8, send_workers=3)
+        try:
+            for _ in range(6):
+                answered = poller.poll(store.items(), fetch=fetch)
+                assert answered == 50
+                poller.join()
+        finally:
+            poller.shutdown()
+        for index in range(50):
+            chat_id = str(index)
+            messages = [text for chat, text in bot.messages if chat == chat_id]
+            expected = [
+                f'Изменился статус проверки работы "hw{index}". '
+                f'{HOMEWORK_STATUSES[status]}'
+                for status in STATUSES * 2
+            ]
+            assert messages == expected, (
+                'Убедитесь, что сообщения одного чата отправляются '
+                'в порядке их формирования'
+            )
+
+    def test_backpressure(self):
+        release = threading.Event()
+
+        class BlockedBot(CollectingBot):
+            def send_message(self, chat_id, text):
+                release.wait()
+                super().send_message(chat_id, text)
+
+        store = StateStore()
+        for index in range(20):
+            store.add(str(index), f'hw{index}', 0)
+        bot = BlockedBot()
+        state = health.Health()
+        poller = make_poller(
+            bot, fetch_workers=2, send_workers=1, queue_size=2,
+            health=state, beat_interval=0.05
+        )
+        done = threading.Event()
+
+        def poll():
+            poller.poll(store.items(), fetch=fetch)
+            done.set()
+
+        thread = threading.Thread(target=poll, daemon=True)
+        thread.start()
+        try:
+            assert not done.wait(0.3), (
+                'Убедитесь, что при заполненной очереди отправки опрос ждёт'
+            )
+            assert poller.queue_depth() <= 2
+            beat, _ = state.stages['poll']
+            assert state.clock() - beat < 0.2, (
+                'Убедитесь, что ожидание места в очереди отправки '
+                'отмечается в health и не считается зависанием опроса'
+            )
+        finally:
+            release.set()
+        assert done.wait(5)
+        poller.shutdown()
+        assert len(bot.messages) == 20
+
+    def test_state_saved_after_delivery(self):
+        class FloodBot(CollectingBot):
+            def __init__(self):
+                super().__init__()
+                self.flood = True
+
+            def send_message(self, chat_id, text):
+                if self.flood:
+                    raise telegram.error.RetryAfter(0)
+                super().send_message(chat_id, text)
+
+        def approved(current_timestamp, practicum_token):
+            if current_timestamp >= 100:
+                return {'homeworks': [], 'current_date': current_timestamp}
+            return {
+                'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+                'current_date': 100,
+            }
+
+        store = StateStore()
+        store.add('1', 'token', 1)
+        bot = FloodBot()
+        poller = make_poller(bot, send_attempts=2, retry_delay=0)
+        try:
+            poller.poll(store.items(), fetch=approved)
+            poller.join()
+            assert store['1']['current_timestamp'] == 1, (
+                'Убедитесь, что состояние подписки не меняется, '
+                'пока сообщение не отправлено'
+            )
+            bot.flood = False
+            poller.poll(store.items(), fetch=approved)
+            poller.join()
+        finally:
+            poller.shutdown()
+        assert [text for _, text in bot.messages] == [
+            f'Изменился статус проверки работы "hw". '
+            f'{HOMEWORK_STATUSES["approved"]}'
+        ]
+        assert store['1']['current_timestamp'] == 100
+
+    def test_restart_hands_over_message(self):
+        release = threading.Event()
+        first_call = threading.Event()
+
+        class HangingBot(CollectingBot):
+            def send_message(self, chat_id, text):
+                if not first_call.is_set():
+                    first_call.set()
+                    release.wait()
+                super().send_message(chat_id, text)
+
+        store = StateStore()
+        store.add('1', 'hw1', 0)
+        bot = HangingBot()
+        poller = make_poller(bot, send_workers=1)
+        try:
+            poller.poll(store.items(), fetch=fetch)
+            assert first_call.wait(5)
+            poller.lanes[0].start()
+            poller.join()
+            assert store['1']['current_timestamp'] == 1, (
+                'Убедитесь, что новый поток отправки доставляет сообщение '
+                'зависшего потока'
+            )
+            poller.poll(store.items(), fetch=fetch)
+            poller.join()
+            messages = [text for _, text in bot.messages]
+        finally:
+            release.set()
+            poller.shutdown()
+        assert messages == [
+            f'Изменился статус проверки работы "hw1". '
+            f'{HOMEWORK_STATUSES[status]}'
+            for status in STATUSES[:2]
+        ], 'Убедитесь, что после перезапуска очереди порядок сохраняется'
+
+    def test_same_health_shards_in_both_modes(self, monkeypatch):
+        store = StateStore()
+        for index in range(20):
+            store.add(str(index), f'hw{index}', 0)
+        expected = {health.Health().shard(str(index)) for index in range(20)}
+        pool = health.Health()
+        poller = make_poller(CollectingBot(), health=pool)
+        try:
+            poller.poll(store.items(), fetch=fetch)
+        finally:
+            poller.shutdown()
+        sequential = health.Health()
+        monkeypatch.setattr(
+            homework, 'process_subscription', lambda *args: True
+        )
+        homework.poll_all(CollectingBot(), store, sequential, None)
+        assert set(pool.last_success) == set(sequential.last_success), (
+            'Убедитесь, что /health показывает одни и те же шарды '
+            'при опросе по очереди и на пулах потоков'
+        )
+        assert set(pool.last_success) == expected
+
+    def test_pool_mode_in_script(self, monkeypatch, tmp_path):
+        class Stop(Exception):
+            pass
+
+        pollers = []
+        watchdogs = []
+
+        class RecordingPoller(executor.ConcurrentPoller):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                pollers.append(self)
+
+        class RecordingWatchdog(health.Watchdog):
+            def __init__(self, *args):
+                super().__init__(*args)
+                watchdogs.append(self)
+
+        sleep = time.sleep
+
+        def stop_after_cycle(seconds):
+            if threading.current_thread() is not threading.main_thread():
+                return sleep(seconds)
+            for poller in pollers:
+                poller.join()
+            raise Stop
+
+        api = MockPracticumAPI(
+            change_every=1,
+            fault=lambda token: (502, b'Bad Gateway')
+            if token == 'broken' else None
+        )
+        config = tmp_path / 'bot.json'
+        config.write_text(json.dumps({
+            'endpoint': api.start(),
+            'subscriptions': {'2': 'token-2', '3': 'broken'},
+        }))
+        trace = tmp_path / 'trace.jsonl'
+        bot = CollectingBot()
+        for name, value in {
+            'PRACTICUM_TOKEN': 'token-1', 'TELEGRAM_TOKEN': '1234:abcdefg',
+            'TELEGRAM_CHAT_ID': '1', 'BOT_CONFIG': str(config),
+            'BOT_FETCH_WORKERS': '2', 'BOT_TRACE': str(trace),
+            'BOT_TRACE_SAMPLE': '1',
+        }.items():
+            monkeypatch.setenv(name, value)
+        monkeypatch.delenv('BOT_RECORD', raising=False)
+        monkeypatch.delenv('BOT_HEALTH_PORT', raising=False)
+        monkeypatch.setattr(sys, 'argv', ['homework.py'])
+        monkeypatch.setattr(telegram, 'Bot', lambda token: bot)
+        monkeypatch.setattr(executor, 'ConcurrentPoller', RecordingPoller)
+        monkeypatch.setattr(health, 'Watchdog', RecordingWatchdog)
+        monkeypatch.setattr(time, 'sleep', stop_after_cycle)
+        logger = logging.getLogger('homework_logger')
+        handlers = list(logger.handlers)
+        try:
+            runpy.run_path(
+                os.path.join(ROOT, 'homework.py'), run_name='__main__'
+            )
+        except Stop:
+            pass
+        finally:
+            for watchdog in watchdogs:
+                watchdog.stop()
+            for poller in pollers:
+                poller.shutdown()
+            logger.handlers = handlers
+            api.stop()
+        assert pollers, 'Убедитесь, что бот запущен на пулах потоков'
+        messages = dict(bot.messages)
+        assert sorted(messages) == ['1', '2'], (
+            'Убедитесь, что при запуске python homework.py сбои опроса '
+            'попадают в сводку ошибок, а не в чат подписки'
+        )
+        traced = sorted(
+            json.loads(line)['chat_id']
+            for line in trace.read_text().splitlines()
+        )
+        assert traced == ['1', '2', '3'], (
+            'Убедитесь, что трассы пишутся и в режиме пула потоков'
+        )
@@ -0,0 +1,96 @@
+import json
+import urllib.error
+import urllib.request
+
+from breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from health import Health, Watchdog, serve_health
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def get(port, path):
+    try:
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}{path}') as r:
+            return r.status, json.loads(r.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+class TestHealth:
+
+    def test_watchdog_restarts_stalled_stage(self):
+        clock = FakeClock()
+        health = Health(clock=clock)
+        restarted = []
+        watchdog = Watchdog(health, grace=5)
+        watchdog.watch('poll', lambda: restarted.append('poll'))
+        health.beat('poll', 10)
+        clock.now = 14
+        assert watchdog.check() == []
+        clock.now = 16
+        assert watchdog.check() == ['poll']
+        assert restarted == ['poll'], (
+            'Убедитесь, что сторожевой поток перезапускает зависший этап'
+        )
+        assert watchdog.check() == [], (
+            'Убедитесь, что после перезапуска этап не перезапускается повторно'
+        )
+        health.idle('send-0')
+        clock.now = 10 ** 6
+        assert 'send-0' not in watchdog.check(), (
+            'Убедитесь, что ожидание пустой очереди не считается зависанием'
+        )
+
+    def test_http_endpoints(self):
+        clock = FakeClock()
+        health = Health(clock=clock)
+        health.gauge('breaker', lambda: CLOSED)
+        server = serve_health(health, 0, grace=5)
+        port = server.server_address[1]
+        try:
+            health.beat('poll', 10)
+            status, data = get(port, '/ready')
+            assert status == 503 and not data['ready']
+            health.poll_succeeded('42')
+            health.set_lag(0.25)
+            status, data = get(port, '/ready')
+            assert status == 200
+            assert data['breaker'] == CLOSED
+            assert data['scheduler_lag'] == 0.25
+            assert list(data['last_success']) == [health.shard('42')]
+            clock.now = 100
+            status, data = get(port, '/health')
+            assert status == 503 and data['stalled_stages'] == ['poll']
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_circuit_breaker(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(threshold=2, cooldown=30, clock=clock)
+        breaker.failure()
+        assert breaker.allow()
+        breaker.failure()
+        assert breaker.state == OPEN and not breaker.allow()
+        clock.now = 30
+        assert breaker.allow() and breaker.state == HALF_OPEN
+        assert not breaker.allow(), (
+            'Проверьте, что в полуоткрытом состоянии проходит одна проба'
+        )
+        breaker.failure()
+        assert not breaker.allow()
+        clock.now = 60
+        assert breaker.allow()
+        clock.now = 90
+        assert breaker.allow(), (
+            'Проверьте, что зависшая проба не блокирует запросы навсегда'
+        )
+        breaker.success()
+        assert breaker.state == CLOSED and breaker.allow()
@@ -0,0 +1,402 @@
+"""
+Длительный прогон main() на виртуальных часах со сбоями API и Telegram.
+
+Параметры задаются переменными окружения:
+SOAK_DAYS - число виртуальных суток (по умолчанию 1),
+SOAK_TENANTS - число подписок (4), SOAK_SEED - зерно случайных сбоев,
+SOAK_REPORT - путь к JSON-отчёту для сравнения между релизами
+(к имени добавляется режим: -sequential или -pool).
+Прогон выполняется в обоих режимах: последовательном и на пулах потоков.
+"""
+import bisect
+import gc
+import itertools
+import json
+import logging
+import os
+import random
+import threading
+import time as real_time
+import tracemalloc
+from collections import Counter
+from types import SimpleNamespace
+
+import telegram
+import telegram.error
+
+import executor
+import health
+import homework
+from benchmarks.mock_api import MockPracticumAPI
+from breaker import CircuitBreaker
+from tracing import percentile
+
+DAYS = int(os.getenv('SOAK_DAYS', '1'))
+TENANTS = int(os.getenv('SOAK_TENANTS', '4'))
+SEED = int(os.getenv('SOAK_SEED', '2026'))
+REPORT = os.getenv('SOAK_REPORT')
+
+DAY = 24 * 60 * 60
+HOUR = 60 * 60
+MEMORY_EVERY = 6 * HOUR
+START = 1700000000
+RETRY_TIME = 600
+REQUEST_TIMEOUT = 0.05
+FETCH_WORKERS = 4
+WATCHDOG_INTERVAL = 0.01
+BURST_CYCLES = 4
+LAG_BOUND = RETRY_TIME * (BURST_CYCLES + 3)
+MEMORY_GROWTH_LIMIT = 256 * 1024
+STATUSES = ('reviewing', 'rejected', 'approved')
+CHANGED = 'Изменился статус проверки работы'
+
+
+class SoakFinished(Exception):
+    pass
+
+
+class VirtualTime:
+    """
+    Заменяет модуль time в homework: sleep() только сдвигает часы.
+    Перед сдвигом вызывает settle(), чтобы время шло, только когда
+    бот простаивает. Каждые MEMORY_EVERY секунд вызывает on_sample().
+    """
+
+    def __init__(self, days, on_sample):
+        self.now = START
+        self.end = START + days * DAY
+        self.sample = 0
+        self.on_sample = on_sample
+        self.settle = None
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        if self.settle is not None:
+            self.settle()
+        self.now += seconds
+        sample = (self.now - START) // MEMORY_EVERY
+        if sample > self.sample:
+            self.sample = sample
+            self.on_sample()
+        if self.now >= self.end:
+            raise SoakFinished
+
+
+def in_bursts(bursts, now):
+    return any(start <= now < end for start, end in bursts)
+
+
+def build_scenario(rng, tenants, days):
+    """
+    Возвращает смены статусов по токенам и непересекающиеся окна
+    сбоев API (5xx) и Telegram (429). Сбой Telegram начинается перед
+    сменой статуса, чтобы уведомление о ней попало в окно сбоя.
+    """
+    end = START + days * DAY
+    changes = {}
+    for index in range(tenants):
+        moment, status, timeline = START, None, []
+        while True:
+            moment += int(rng.uniform(2 * HOUR, 10 * HOUR))
+            if moment >= end:
+                break
+            status = rng.choice([item for item in STATUSES if item != status])
+            timeline.append((moment, status))
+        changes[f'token-{index}'] = timeline
+    moments = sorted(
+        moment for timeline in changes.values() for moment, _ in timeline
+    )
+    bursts = {'api': [], 'telegram': []}
+    kinds = itertools.cycle(bursts)
+    moment = START
+    while True:
+        moment += int(rng.uniform(4 * HOUR, 8 * HOUR))
+        kind = next(kinds)
+        if kind == 'telegram':
+            following = bisect.bisect(moments, moment)
+            if following < len(moments):
+                moment = moments[following] - rng.randint(0, RETRY_TIME)
+        if moment >= end:
+            break
+        length = rng.randint(1, BURST_CYCLES) * RETRY_TIME
+        bursts[kind].append((moment, moment + length))
+        moment += length + LAG_BOUND
+    return changes, bursts
+
+
+class SoakAPI(MockPracticumAPI):
+    """API Практикума, которое отдаёт смены статусов по виртуальным часам."""
+
+    def __init__(self, clock, changes, bursts, rng, faults):
+        super().__init__(fault=self.inject)
+        self.clock = clock
+        self.changes = changes
+        self.bursts = bursts
+        self.rng = rng
+        self.faults = faults
+
+    def inject(self, token):
+        with self.lock:
+            self.faults['requests'] += 1
+            roll = self.rng.random()
+        if in_bursts(self.bursts, self.clock.now):
+            self.faults['5xx'] += 1
+            return 503, b'Service Unavailable'
+        if roll < 0.02:
+            self.faults['malformed_json'] += 1
+            return 200, b'{"homeworks": ['
+        if roll < 0.03:
+            self.faults['latency_spike'] += 1
+            real_time.sleep(REQUEST_TIMEOUT * 2)
+        return None
+
+    def respond(self, token, params):
+        now = self.clock.now
+        from_date = int(params['from_date'])
+        homeworks = [
+            {'homework_name': f'{token}.zip', 'status': status}
+            for moment, status in reversed(self.changes.get(token, []))
+            if from_date <= moment < now
+        ]
+        return 200, {'homeworks': homeworks, 'current_date': now}
+
+
+class FakeTelegram:
+    """
+    Бот Telegram, который отвечает 429 в окна сбоев.
+    Хранит только статусы из уведомлений, а не тексты, чтобы
+    собственные данные теста не попадали в замер памяти бота.
+    """
+
+    def __init__(self, clock, bursts, faults):
+        self.clock = clock
+        self.bursts = bursts
+        self.faults = faults
+        self.delivered = []
+        self.other = Counter()
+
+    def send_message(self, chat_id, text):
+        if in_bursts(self.bursts, self.clock.now):
+            self.faults['telegram_429'] += 1
+            raise telegram.error.RetryAfter(30)
+        if text.startswith(CHANGED):
+            status = delivered_status(text)
+            self.delivered.append((chat_id, self.clock.now, status))
+        else:
+            self.other[chat_id, text.split(',')[0].split(':')[0]] += 1
+
+
+def traced_memory():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def delivered_status(text):
+    """Возвращает статус работы по тексту уведомления."""
+    for status, verdict in homework.HOMEWORK_STATUSES.items():
+        if text.endswith(verdict):
+            return status
+    return None
+
+
+def analyze(changes, delivered, end):
+    """
+    Сверяет доставленные уведомления со сменами статусов.
+    Смена может быть пропущена, только если следующая смена произошла
+    раньше, чем истекла допустимая задержка доставки.
+    """
+    result = {
+        'upstream_changes': 0, 'delivered': 0, 'superseded': 0,
+        'lost': 0, 'duplicates': 0, 'unexpected': 0,
+    }
+    lags = []
+    for index, (token, timeline) in enumerate(sorted(changes.items())):
+        deliveries = [
+            (moment, status) for chat_id, moment, status in delivered
+            if chat_id == str(index)
+        ]
+        result['upstream_changes'] += len(timeline)
+        result['delivered'] += len(deliveries)
+        position = 0
+        for moment, status in deliveries:
+            match = next((
+                number for number in range(position, len(timeline))
+                if timeline[number][1] == status
+                and timeline[number][0] <= moment
+            ), None)
+            if match is None:
+                repeated = position and timeline[position - 1][1] == status
+                result['duplicates' if repeated else 'unexpected'] += 1
+                continue
+            lags.append(moment - timeline[match][0])
+            for number in range(position, match):
+                superseded_after = (
+                    timeline[number + 1][0] - timeline[number][0]
+                )
+                if superseded_after <= LAG_BOUND:
+                    result['superseded'] += 1
+                else:
+                    result['lost'] += 1
+            position = match + 1
+        result['lost'] += sum(
+            1 for moment, _ in timeline[position:] if moment < end - LAG_BOUND
+        )
+    lags.sort()
+    result['lag_seconds'] = {
+        'p50': percentile(lags, 0.5),
+        'p95': percentile(lags, 0.95),
+        'max': lags[-1] if lags else 0,
+    }
+    return result
+
+
+def run_soak(monkeypatch, tmp_path, fetch_workers):
+    """Прогоняет main() по сценарию и возвращает отчёт."""
+    rng = random.Random(SEED)
+    changes, bursts = build_scenario(rng, TENANTS, DAYS)
+    faults = dict.fromkeys((
+        'requests', '5xx', 'malformed_json', 'latency_spike', 'telegram_429'
+    ), 0)
+    memory = []
+    clock = VirtualTime(DAYS, lambda: memory.append(traced_memory()))
+    api = SoakAPI(clock, changes, bursts['api'], rng, faults)
+    endpoint = api.start()
+    bot = FakeTelegram(clock, bursts['telegram'], faults)
+    config = tmp_path / 'bot.json'
+    config.write_text(json.dumps({
+        'retry_time': RETRY_TIME,
+        'endpoint': endpoint,
+        'subscriptions': {
+            str(index): f'token-{index}' for index in range(TENANTS)
+        },
+    }))
+    stalled = []
+    watchdogs = []
+    pollers = []
+
+    class RecordingWatchdog(health.Watchdog):
+        def __init__(self, *args):
+            super().__init__(*args)
+            self.checks = 0
+            watchdogs.append(self)
+
+        def check(self):
+            self.checks += 1
+            stages = super().check()
+            stalled.extend(stages)
+            return stages
+
+    start_poller = homework.start_poller
+
+    def recording_start_poller(*args):
+        poller = start_poller(*args)
+        pollers.append(poller)
+        clock.settle = poller.join
+        return poller
+
+    monkeypatch.setattr(telegram, 'Bot', lambda token: bot)
+    monkeypatch.setattr(health, 'Watchdog', RecordingWatchdog)
+    monkeypatch.setattr(executor, 'time', SimpleNamespace(sleep=lambda _: 0))
+    monkeypatch.setattr(homework, 'time', clock)
+    monkeypatch.setattr(homework, 'start_poller', recording_start_poller)
+    monkeypatch.setattr(homework, 'restart_process', lambda: None)
+    monkeypatch.setattr(homework, 'CONFIG_PATH', str(config))
+    monkeypatch.setattr(homework, 'PRACTICUM_TOKEN', 'operator')
+    monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', '1234:abcdefg')
+    monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', 'operator')
+    monkeypatch.setattr(homework, 'REQUEST_TIMEOUT', REQUEST_TIMEOUT)
+    monkeypatch.setattr(homework, 'WATCHDOG_INTERVAL', WATCHDOG_INTERVAL)
+    monkeypatch.setattr(homework, 'FETCH_WORKERS', fetch_workers)
+    monkeypatch.setattr(homework, 'ENDPOINT', homework.ENDPOINT)
+    monkeypatch.setattr(homework, 'RETRY_TIME', homework.RETRY_TIME)
+    monkeypatch.setattr(
+        homework, 'BREAKER', CircuitBreaker(clock=clock.monotonic)
+    )
+    for name in ('RECORDER', 'TRACER', 'ALERTS', 'SESSION',
+                 'RECORD_PATH', 'TRACE_PATH', 'HEALTH_PORT'):
+        monkeypatch.setattr(homework, name, None)
+
+    threads = threading.active_count()
+    started = real_time.perf_counter()
+    logging.disable(logging.CRITICAL)
+    tracemalloc.start()
+    try:
+        homework.main()
+    except SoakFinished:
+        pass
+    finally:
+        tracemalloc.stop()
+        for watchdog in watchdogs:
+            watchdog.stop()
+            watchdog.join()
+        for poller in pollers:
+            poller.shutdown()
+        logging.disable(logging.NOTSET)
+        api.stop()
+
+    return {
+        'seed': SEED,
+        'days': DAYS,
+        'tenants': TENANTS,
+        'fetch_workers': fetch_workers,
+        'wall_time_seconds': round(real_time.perf_counter() - started, 2),
+        'faults': faults,
+        'notifications': analyze(changes, bot.delivered, clock.end),
+        'operator_alerts': bot.other['operator', 'Сбой в работе программы'],
+        'memory_bytes_every_6h': memory,
+        'memory_growth_bytes': memory[-1] - memory[0],
+        'watchdog_checks': watchdogs[0].checks,
+        'watchdog_restarts': stalled,
+        'threads_added': threading.active_count() - threads,
+    }, bursts
+
+
+def check_report(report, bursts, tmp_path, mode):
+    """Сохраняет отчёт и проверяет его."""
+    report_path = str(tmp_path / 'soak_report.json')
+    if REPORT:
+        root, ext = os.path.splitext(REPORT)
+        report_path = f'{root}-{mode}{ext}'
+    with open(report_path, 'w', encoding='utf-8') as report_file:
+        json.dump(report, report_file, ensure_ascii=False, indent=4)
+    print(json.dumps(report, ensure_ascii=False))
+
+    notifications = report['notifications']
+    assert report['faults']['5xx'] and bursts['telegram'], (
+        'Сценарий должен содержать сбои API и Telegram'
+    )
+    assert notifications['delivered'] > 0
+    assert notifications['lost'] == 0, (
+        f'Уведомления потеряны: {notifications}'
+    )
+    assert notifications['duplicates'] == 0, (
+        f'Уведомления продублированы: {notifications}'
+    )
+    assert notifications['unexpected'] == 0
+    assert notifications['lag_seconds']['max'] <= LAG_BOUND, (
+        f'Задержка доставки больше {LAG_BOUND} с: {notifications}'
+    )
+    assert report['memory_growth_bytes'] < MEMORY_GROWTH_LIMIT, (
+        f'Рост памяти за прогон: {report["memory_growth_bytes"]} байт'
+    )
+    assert report['watchdog_checks'] > 0
+    assert not report['watchdog_restarts'], (
+        f'Сторожевой поток перезапускал этапы: {report["watchdog_restarts"]}'
+    )
+    assert report['threads_added'] <= 0, 'Потоки бота не остановлены'
+
+
+class TestSoak:
+
+    def test_soak_sequential(self, monkeypatch, tmp_path):
+        report, bursts = run_soak(monkeypatch, tmp_path, 0)
+        check_report(report, bursts, tmp_path, 'sequential')
+
+    def test_soak_thread_pool(self, monkeypatch, tmp_path):
+        report, bursts = run_soak(monkeypatch, tmp_path, FETCH_WORKERS)
+        check_report(report, bursts, tmp_path, 'pool')
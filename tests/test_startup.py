@@ -0,0 +1,49 @@
+import subprocess
+import sys
+from os.path import abspath, dirname, join
+
+ROOT_DIR = dirname(dirname(abspath(__file__)))
+
+
+class TestStartup:
+
+    def test_heavy_modules_are_lazy(self):
+        code = (
+            'import logging, sys, homework; '
+            'print(sorted(m for m in ("requests", "telegram") '
+            'if m in sys.modules)); '
+            'print(len(logging.getLogger().handlers))'
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', code], cwd=ROOT_DIR,
+            capture_output=True, text=True, check=True
+        )
+        loaded, handlers = result.stdout.splitlines()
+        assert loaded == '[]', (
+            'Убедитесь, что `requests` и `telegram` импортируются '
+            f'при первом использовании, а не при импорте модуля: {loaded}'
+        )
+        assert handlers == '0', (
+            'Убедитесь, что логирование настраивается при запуске бота, '
+            'а не при импорте модуля'
+        )
+
+    def test_import_times(self):
+        from startup import import_times
+
+        names = [name for _, _, name in import_times(('config',))]
+        assert 'config' in names
+
+    def test_profile_from_other_directory(self, tmp_path):
+        result = subprocess.run(
+            [
+                sys.executable, join(ROOT_DIR, 'homework.py'),
+                '--profile-startup'
+            ],
+            cwd=tmp_path, capture_output=True, text=True
+        )
+        assert result.returncode == 0, (
+            'Убедитесь, что профилирование запуска работает из любой '
+            f'директории: {result.stderr}'
+        )
+        assert 'homework' in result.stdout
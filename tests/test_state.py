@@ -0,0 +1,95 @@
+import tracemalloc
+
+from state import NO_MESSAGE, StateStore, message_fingerprint
+
+
+class TestState:
+
+    def test_add_and_remove(self):
+        store = StateStore()
+        for chat_id in ('1', '2', '3'):
+            store.add(chat_id, f'token-{chat_id}', int(chat_id))
+        store['3']['message_fingerprint'] = message_fingerprint('message')
+        store.remove('1')
+        store.remove('missing')
+        assert len(store) == 2 and '1' not in store
+        assert store['3']['practicum_token'] == 'token-3', (
+            'Проверьте, что удаление подписки не портит состояние остальных'
+        )
+        assert store['3']['current_timestamp'] == 3
+        assert store['3']['message_fingerprint'] == message_fingerprint(
+            'message'
+        )
+        assert store['2']['message_fingerprint'] == NO_MESSAGE
+        assert [chat_id for chat_id, _ in store.items()] == ['3', '2']
+
+    def test_fingerprint(self):
+        assert message_fingerprint(None) == NO_MESSAGE
+        assert message_fingerprint('a') == message_fingerprint('a')
+        assert message_fingerprint('a') != message_fingerprint('b')
+
+    def test_memory_per_tenant(self):
+        count = 10000
+        chat_ids = [str(100000000 + index) for index in range(count)]
+        tracemalloc.start()
+        store = StateStore()
+        for chat_id in chat_ids:
+            store.add(chat_id, 'token', 0)
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        assert size / count < 128, (
+            f'Состояние подписки занимает {size / count:.0f} байт'
+        )
+
+    def test_process_subscription_deduplicates(self):
+        import homework
+        from traffic import CollectingBot
+
+        def fetch(current_timestamp, practicum_token):
+            return {'homeworks': [], 'current_date': 1}
+
+        store = StateStore()
+        store.add('1', 'token', 0)
+        bot = CollectingBot()
+        for _ in range(3):
+            homework.process_subscription(bot, '1', store['1'], fetch=fetch)
+        assert len(bot.messages) == 1, (
+            'Убедитесь, что одинаковые сообщения не отправляются повторно'
+        )
+
+    def test_invalid_current_date(self, monkeypatch):
+        import homework
+        from traffic import CollectingBot
+
+        monkeypatch.setattr(homework, 'ALERTS', None)
+        store = StateStore()
+        store.add('1', 'token', 0)
+        bot = CollectingBot()
+        for current_date in (None, '1', 1.5, 2 ** 64, True):
+            def fetch(current_timestamp, practicum_token):
+                return {
+                    'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+                    'current_date': current_date,
+                }
+
+            assert homework.process_subscription(
+                bot, '1', store['1'], fetch=fetch
+            )
+            assert store['1']['current_timestamp'] > 0, (
+                f'Проверьте, что current_date={current_date!r} '
+                'заменяется текущим временем'
+            )
+        assert len(bot.messages) == 5
+
+    def test_status_codes_follow_homework_statuses(self):
+        import homework
+        from state import NO_STATUS, status_codes
+
+        codes = status_codes({**homework.HOMEWORK_STATUSES, 'new': '...'})
+        assert codes[None] == NO_STATUS
+        assert len(set(codes.values())) == len(codes), (
+            'Проверьте, что каждый статус получает свой код'
+        )
+        assert set(homework.STATUS_CODES) == (
+            set(homework.HOMEWORK_STATUSES) | {None}
+        )
@@ -0,0 +1,85 @@
+import json
+
+import homework
+import tracing
+from state import StateStore
+from traffic import CollectingBot
+
+
+class TestTracing:
+
+    def test_spans_and_report(self, monkeypatch, tmp_path, capsys):
+        path = tmp_path / 'trace.jsonl'
+        tracer = tracing.Tracer(str(path), sample_rate=1)
+        monkeypatch.setattr(homework, 'TRACER', tracer)
+
+        def fetch(current_timestamp, practicum_token):
+            return {
+                'homeworks': [{
+                    'homework_name': 'hw1',
+                    'status': 'approved',
+                    'date_updated': '2020-02-13T14:40:57Z',
+                }],
+                'current_date': 1,
+            }
+
+        store = StateStore()
+        store.add('1', 'token', 0)
+        homework.process_subscription(
+            CollectingBot(), '1', store['1'], fetch=fetch
+        )
+        tracer.close()
+
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert len(records) == 1
+        record = records[0]
+        assert record['chat_id'] == '1'
+        assert [name for name, _, _ in record['spans']] == [
+            'check_response', 'parse_status', 'send'
+        ]
+        assert record['delivery_latency'] > 0, (
+            'Проверьте, что в трассе есть задержка от смены статуса '
+            'до доставки сообщения'
+        )
+
+        tracing.report(str(path))
+        output = capsys.readouterr().out
+        assert 'parse_status' in output and 'доставка' in output
+
+    def test_not_sampled(self, tmp_path):
+        tracer = tracing.Tracer(str(tmp_path / 'trace.jsonl'), sample_rate=0)
+        with tracing.trace(tracer) as current:
+            with tracing.span('fetch'):
+                pass
+        tracer.close()
+        assert current is None
+        assert (tmp_path / 'trace.jsonl').read_text() == ''
+
+    def test_send_traced_in_send_lane(self, monkeypatch, tmp_path):
+        path = tmp_path / 'trace.jsonl'
+        tracer = tracing.Tracer(str(path), sample_rate=1)
+        monkeypatch.setattr(homework, 'TRACER', tracer)
+
+        def fetch(current_timestamp, practicum_token):
+            return {
+                'homeworks': [{
+                    'homework_name': 'hw1',
+                    'status': 'approved',
+                    'date_updated': '2020-02-13T14:40:57Z',
+                }],
+                'current_date': 1,
+            }
+
+        store = StateStore()
+        store.add('1', 'token', 0)
+        poller = homework.make_poller(CollectingBot())
+        poller.poll(store.items(), fetch=fetch)
+        poller.shutdown()
+        tracer.close()
+
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert len(records) == 1
+        assert [name for name, _, _ in records[0]['spans']] == [
+            'check_response', 'parse_status', 'send'
+        ], 'Проверьте, что отправка в очереди попадает в трассу опроса'
+        assert records[0]['delivery_latency'] > 0
@@ -0,0 +1,144 @@
+import gzip
+import json
+
+import requests
+
+import homework
+from breaker import CircuitBreaker
+from traffic import CollectingBot, Recorder, read_records, replay
+
+
+class MockResponse:
+
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self.headers = {'Content-Type': 'application/json'}
+        self.text = json.dumps(data)
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class TestTraffic:
+
+    def test_record_and_replay(self, monkeypatch, tmp_path):
+        answers = iter([
+            MockResponse(200, {
+                'homeworks': [{'homework_name': 'hw1', 'status': 'reviewing'}],
+                'current_date': 1
+            }),
+            MockResponse(200, {
+                'homeworks': [{'homework_name': 'hw1', 'status': 'unknown'}],
+                'current_date': 2
+            }),
+            MockResponse(500, {}),
+        ])
+
+        def mock_get(*args, **kwargs):
+            assert 'headers' in kwargs
+            return next(answers)
+
+        def mock_timeout(*args, **kwargs):
+            raise requests.exceptions.ConnectTimeout('timeout')
+
+        path = tmp_path / 'traffic.jsonl.gz'
+        monkeypatch.setattr(requests, 'get', mock_get)
+        monkeypatch.setattr(homework, 'BREAKER', CircuitBreaker())
+        monkeypatch.setattr(homework, 'RECORDER', Recorder(str(path)))
+        for _ in range(3):
+            try:
+                homework.get_api_answer(0)
+            except Exception:
+                pass
+        monkeypatch.setattr(requests, 'get', mock_timeout)
+        try:
+            homework.get_api_answer(0)
+        except homework.BadRequest:
+            pass
+        homework.RECORDER.close()
+
+        records = list(read_records(str(path)))
+        assert [record.get('status') for record in records] == [
+            200, 200, 500, None
+        ]
+        assert 'OAuth' not in path.read_bytes().decode('latin-1'), (
+            'Убедитесь, что токен авторизации не попадает в запись трафика'
+        )
+
+        bot = CollectingBot()
+        stats = replay(str(path), bot)
+        assert stats['records'] == 4
+        messages = [message for _, message in bot.messages]
+        assert messages[0].endswith('Работа взята на проверку ревьюером.')
+        assert 'Недокументированный статус' in messages[1]
+        assert 'status_code запроса: 500' in messages[2]
+        assert 'ConnectTimeout' in messages[3]
+
+    def test_read_records_after_crash(self, tmp_path):
+        path = str(tmp_path / 'traffic.jsonl.gz')
+        with open(path, 'wb') as record_file:
+            record_file.write(gzip.compress(b'{"number": 0}\n'))
+            record_file.write(gzip.compress(b'{"number": 1}\n')[:-10])
+        recorder = Recorder(path)
+        for number in range(2, 4):
+            recorder.write({'number': number})
+        recorder.file.close()
+        numbers = [record['number'] for record in read_records(path)]
+        assert numbers == [0, 2, 3], (
+            'Проверьте, что оборванный хвост файла пропускается'
+        )
+        recorder = Recorder(path)
+        for number in range(4, 6):
+            recorder.write({'number': number})
+        recorder.file.close()
+        numbers = [record['number'] for record in read_records(path)]
+        assert numbers == [0, 2, 3, 4, 5], (
+            'Проверьте, что записи читаются после перезапуска без close()'
+        )
+
+    def test_restart_after_partial_write(self, tmp_path):
+        path = tmp_path / 'traffic.jsonl.gz'
+        recorder = Recorder(str(path))
+        for number in range(3):
+            recorder.write({'number': number})
+        recorder.file.close()
+        size = path.stat().st_size
+        recorder = Recorder(str(path))
+        recorder.write({'number': 3, 'padding': 'x' * 100})
+        recorder.file.close()
+        with open(path, 'r+b') as record_file:
+            record_file.truncate(size + 15)
+        recorder = Recorder(str(path))
+        recorder.write({'number': 4})
+        recorder.close()
+        numbers = [record['number'] for record in read_records(str(path))]
+        assert numbers == [0, 1, 2, 4], (
+            'Проверьте, что после записи, оборванной на середине, '
+            'читаются записи следующего запуска'
+        )
+
+    def test_records_compressed_together(self, tmp_path):
+        path = tmp_path / 'traffic.jsonl.gz'
+        recorder = Recorder(str(path))
+        raw = 0
+        for number in range(100):
+            response = MockResponse(200, {
+                'homeworks': [{
+                    'homework_name': 'user__hw_python_oop.zip',
+                    'status': 'approved',
+                    'reviewer_comment': 'Всё нравится',
+                }],
+                'current_date': 1581604970 + number,
+            })
+            recorder.record({'from_date': number}, response, 0.1)
+            raw += len(response.text)
+        recorder.close()
+        assert path.stat().st_size < raw / 4, (
+            'Убедитесь, что записи сжимаются одним потоком, '
+            'а не каждая отдельно'
+        )
+        assert len(list(read_records(str(path)))) == 100
+        with gzip.open(path, 'rt', encoding='utf-8') as record_file:
+            assert len(record_file.readlines()) == 100, (
+                'Убедитесь, что закрытый файл записи читается gzip'
+            )
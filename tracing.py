@@ -0,0 +1,217 @@
+"""
+Трассировка цикла опроса подписки по этапам.
+
+Этапы: fetch (HTTP-запрос), decode (разбор JSON), check_response,
+parse_status (проверка статуса и текст сообщения), send.
+
+Трассировка включается переменной окружения BOT_TRACE=<путь к .jsonl>,
+доля записываемых циклов задаётся BOT_TRACE_SAMPLE (по умолчанию 0.1).
+Отчёт:
+
+    python tracing.py <путь к .jsonl> [--top N]
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+active = threading.local()
+
+
+class Tracer:
+    """Записывает выбранные трассы в файл, по одной JSON-строке на трассу."""
+
+    def __init__(self, path, sample_rate=0.1):
+        """Открывает файл трасс в режиме дозаписи."""
+        self.file = open(path, 'a', encoding='utf-8', buffering=1)
+        self.sample_rate = sample_rate
+        self.lock = threading.Lock()
+
+    def sampled(self):
+        """Решает, записывать ли очередную трассу."""
+        return random.random() < self.sample_rate
+
+    def export(self, trace):
+        """Записывает завершённую трассу."""
+        line = json.dumps(trace.as_dict(), separators=(',', ':'))
+        with self.lock:
+            self.file.write(line + '\n')
+
+    def close(self):
+        """Закрывает файл трасс."""
+        with self.lock:
+            self.file.close()
+
+
+class Trace:
+    """Трасса одного цикла опроса подписки."""
+
+    __slots__ = ('trace_id', 'started', 'start', 'spans', 'attributes',
+                 'tracer', 'detached')
+
+    def __init__(self, tracer=None, **attributes):
+        """Начинает трассу с новым идентификатором."""
+        self.trace_id = f'{random.getrandbits(64):016x}'
+        self.started = time.time()
+        self.start = time.perf_counter()
+        self.spans = []
+        self.attributes = attributes
+        self.tracer = tracer
+        self.detached = False
+
+    def detach(self):
+        """
+        Передаёт завершение трассы другому потоку.
+        Трасса будет записана в конце блока resume(), а не trace().
+        """
+        self.detached = True
+
+    def delivered(self, date_updated):
+        """
+        Запоминает задержку от смены статуса в API до доставки сообщения.
+        date_updated - время смены статуса из ответа API.
+        Некорректная дата не прерывает цикл опроса и пропускается.
+        """
+        from datetime import datetime
+
+        try:
+            changed_at = datetime.strptime(
+                date_updated, '%Y-%m-%dT%H:%M:%S%z'
+            ).timestamp()
+        except (TypeError, ValueError):
+            return
+        latency = round(time.time() - changed_at, 3)
+        self.attributes['delivery_latency'] = latency
+
+    def as_dict(self):
+        """Возвращает трассу в виде словаря для экспорта."""
+        return {
+            'trace_id': self.trace_id,
+            'time': self.started,
+            'duration': round(time.perf_counter() - self.start, 6),
+            'spans': self.spans,
+            **self.attributes,
+        }
+
+
+@contextmanager
+def trace(tracer, **attributes):
+    """
+    Начинает трассу, если трассировка включена и цикл попал в выборку.
+    Внутри блока span() добавляет участки к активной трассе потока.
+    Возвращает трассу или None.
+    """
+    if tracer is None or not tracer.sampled():
+        yield None
+        return
+    current = Trace(tracer, **attributes)
+    active.trace = current
+    try:
+        yield current
+    finally:
+        active.trace = None
+        if not current.detached:
+            tracer.export(current)
+
+
+@contextmanager
+def resume(current):
+    """
+    Продолжает трассу current, переданную через detach(), в текущем потоке.
+    Записывает трассу в конце блока. Без трассы ничего не делает.
+    """
+    if current is None:
+        yield None
+        return
+    active.trace = current
+    try:
+        yield current
+    finally:
+        active.trace = None
+        current.tracer.export(current)
+
+
+@contextmanager
+def span(name):
+    """Замеряет участок name активной трассы. Без трассы ничего не делает."""
+    current = getattr(active, 'trace', None)
+    if current is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        current.spans.append((
+            name,
+            round(start - current.start, 6),
+            round(end - start, 6),
+        ))
+
+
+def percentile(values, fraction):
+    """Возвращает перцентиль отсортированного списка (ближайший ранг)."""
+    if not values:
+        return 0.0
+    index = max(int(round(fraction * len(values))) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+def read_traces(path):
+    """Построчно читает файл трасс."""
+    with open(path, encoding='utf-8') as trace_file:
+        for line in trace_file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def report(path, top=10):
+    """Печатает время этапов, самые медленные трассы и задержку доставки."""
+    stages = defaultdict(list)
+    latencies = []
+    traces = []
+    for record in read_traces(path):
+        for name, _, duration in record['spans']:
+            stages[name].append(duration)
+        if 'delivery_latency' in record:
+            latencies.append(record['delivery_latency'])
+        traces.append((record['duration'], record['trace_id'], record))
+    print(f'Трасс: {len(traces)}')
+    print(f'{"Этап":<16}{"кол-во":>8}{"p50, мс":>10}{"p95, мс":>10}'
+          f'{"p99, мс":>10}{"макс, мс":>10}')
+    by_total = sorted(stages.items(), key=lambda item: -sum(item[1]))
+    for name, durations in by_total:
+        durations.sort()
+        print(f'{name:<16}{len(durations):>8}'
+              + ''.join(f'{percentile(durations, q) * 1000:>10.1f}'
+                        for q in (0.5, 0.95, 0.99, 1.0)))
+    print(f'Самые медленные трассы, топ-{top}:')
+    for duration, trace_id, record in sorted(traces, reverse=True)[:top]:
+        slowest = max(record['spans'], key=lambda item: item[2],
+                      default=('-', 0, 0))
+        print(f'  {trace_id} чат {record.get("chat_id")}: '
+              f'{duration * 1000:.1f} мс, дольше всего {slowest[0]} '
+              f'({slowest[2] * 1000:.1f} мс)')
+    if latencies:
+        latencies.sort()
+        print('Смена статуса -> доставка сообщения, с: ' + ', '.join(
+            f'p{int(q * 100)}={percentile(latencies, q):.0f}'
+            for q in (0.5, 0.95, 0.99)
+        ))
+
+
+def main():
+    """Печатает отчёт по файлу трасс."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('path')
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+    report(args.path, args.top)
+
+
+if __name__ == '__main__':
+    main()
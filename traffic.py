@@ -0,0 +1,230 @@
+"""
+Запись и воспроизведение трафика API Практикума.
+
+Запись включается переменной окружения BOT_RECORD=<путь к .jsonl.gz>.
+Воспроизведение:
+
+    python traffic.py <путь к .jsonl.gz> [--speed N]
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+
+import homework
+from exceptions import BadRequest
+from state import StateStore
+
+# Заголовок gzip-блока записи: без имени файла и времени, ОС неизвестна.
+MEMBER_HEADER = b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff'
+READ_CHUNK = 1 << 16
+
+
+class Recorder:
+    """
+    Пишет сырые ответы API в сжатый gzip-файл, по одному JSON на строку.
+    Запрос не сохраняется целиком: токен авторизации в лог не попадает.
+    Все записи одного запуска сжимаются одним потоком deflate (gzip-блоком
+    с заголовком MEMBER_HEADER), поэтому похожие ответы сжимаются друг
+    о друга. Бот останавливается без close() (kill, сторожевой поток),
+    поэтому после каждой записи поток сбрасывается (Z_SYNC_FLUSH):
+    файл читается в любой момент, в том числе после перезапуска
+    с дозаписью.
+    """
+
+    def __init__(self, path):
+        """Открывает файл записи в режиме дозаписи и начинает gzip-блок."""
+        self.file = open(path, 'ab')
+        self.compressor = zlib.compressobj(
+            zlib.Z_BEST_COMPRESSION, zlib.DEFLATED, -zlib.MAX_WBITS
+        )
+        self.crc = 0
+        self.size = 0
+        self.lock = threading.Lock()
+        self.file.write(MEMBER_HEADER)
+        self.file.flush()
+
+    def write(self, entry):
+        """Записывает одну строку лога и сбрасывает её на диск."""
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+        data = f'{line}\n'.encode('utf-8')
+        with self.lock:
+            self.crc = zlib.crc32(data, self.crc)
+            self.size += len(data)
+            self.file.write(
+                self.compressor.compress(data)
+                + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+            )
+            self.file.flush()
+
+    def record(self, params, response, elapsed):
+        """Сохраняет статус, заголовки, тело ответа и время запроса."""
+        self.write({
+            'time': time.time(),
+            'elapsed': round(elapsed, 6),
+            'params': params,
+            'status': response.status_code,
+            'headers': dict(response.headers),
+            'body': response.text,
+        })
+
+    def record_error(self, params, error, elapsed):
+        """Сохраняет ошибку соединения вместо ответа."""
+        self.write({
+            'time': time.time(),
+            'elapsed': round(elapsed, 6),
+            'params': params,
+            'error': f'{type(error).__name__}: {error}',
+        })
+
+    def close(self):
+        """Завершает gzip-блок и закрывает файл."""
+        with self.lock:
+            self.file.write(
+                self.compressor.flush()
+                + struct.pack('<II', self.crc, self.size & 0xffffffff)
+            )
+            self.file.close()
+
+
+class RecordedResponse:
+    """Ответ API, восстановленный из записи."""
+
+    def __init__(self, entry):
+        """Восстанавливает ответ из строки лога."""
+        self.status_code = entry['status']
+        self.headers = entry.get('headers', {})
+        self.text = entry.get('body', '')
+
+    def json(self):
+        """Разбирает тело ответа так же, как requests."""
+        return json.loads(self.text)
+
+
+class CollectingBot:
+    """Бот, который складывает сообщения в список вместо отправки."""
+
+    def __init__(self):
+        """Создаёт пустой список сообщений."""
+        self.messages = []
+
+    def send_message(self, chat_id, text):
+        """Сохраняет сообщение."""
+        self.messages.append((chat_id, text))
+
+
+def read_members(data, start, end):
+    """
+    Распаковывает gzip-блоки из data[start:end] и возвращает их строки.
+    Оборванный блок читается до последней полной строки.
+    """
+    position = start
+    while position < end:
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        tail = b''
+        try:
+            while position < end and not decompressor.eof:
+                chunk = data[position:min(position + READ_CHUNK, end)]
+                position += len(chunk)
+                lines = (tail + decompressor.decompress(chunk)).split(b'\n')
+                tail = lines.pop()
+                yield from lines
+        except zlib.error:
+            return
+        if not decompressor.eof:
+            return
+        position -= len(decompressor.unused_data)
+
+
+def read_records(path):
+    """
+    Построчно читает записанный трафик.
+    Каждый запуск бота начинает файл с нового MEMBER_HEADER, поэтому
+    оборванный при аварийной остановке блок пропускается до конца,
+    а записи следующих запусков читаются.
+    """
+    with open(path, 'rb') as record_file:
+        if not os.fstat(record_file.fileno()).st_size:
+            return
+        with mmap.mmap(
+            record_file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as data:
+            start = 0
+            while start < len(data):
+                end = data.find(MEMBER_HEADER, start + 1)
+                if end == -1:
+                    end = len(data)
+                for line in read_members(data, start, end):
+                    if not line.strip():
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        break
+                start = end
+
+
+def recorded_fetch(entry):
+    """
+    Возвращает функцию fetch для process_subscription.
+    Вместо запроса к API она отдаёт записанный ответ и воспроизводит ошибки.
+    """
+    def fetch(current_timestamp, practicum_token):
+        if 'error' in entry:
+            raise BadRequest(
+                'Нет возможности получить информацию с сервера. '
+                f'Ошибка: {entry["error"]}.'
+            )
+        return homework.parse_api_response(RecordedResponse(entry))
+    return fetch
+
+
+def replay(path, bot, chat_id='replay', speed=0):
+    """
+    Прогоняет записанный трафик через обработку одной подписки.
+    Ответы проходят check_response, parse_status и send_message.
+    speed=0 - максимально быстро, иначе ускорение относительно записи.
+    Возвращает статистику воспроизведения.
+    """
+    subscriptions = StateStore()
+    subscriptions.add(chat_id, 'replay', 0)
+    subscription = subscriptions[chat_id]
+    records = 0
+    previous_time = None
+    start = time.perf_counter()
+    for entry in read_records(path):
+        if speed and previous_time is not None:
+            time.sleep(max(entry['time'] - previous_time, 0) / speed)
+        previous_time = entry['time']
+        homework.process_subscription(
+            bot, chat_id, subscription, fetch=recorded_fetch(entry)
+        )
+        records += 1
+    return {'records': records, 'elapsed': time.perf_counter() - start}
+
+
+def main():
+    """Воспроизводит записанный трафик без отправки в Telegram."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('path')
+    parser.add_argument('--speed', type=float, default=0)
+    args = parser.parse_args()
+    bot = CollectingBot()
+    stats = replay(args.path, bot, speed=args.speed)
+    records = stats['records']
+    elapsed = stats['elapsed']
+    print(f'Записей: {records}, сообщений: {len(bot.messages)}')
+    rate = records / max(elapsed, 1e-9)
+    print(f'Время: {elapsed:.3f} с, {rate:.0f} записей/с')
+    messages = Counter(message for _, message in bot.messages)
+    for message, count in messages.most_common():
+        print(f'  {count:>6} x {message}')
+
+
+if __name__ == '__main__':
+    main()